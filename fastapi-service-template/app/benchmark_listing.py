@@ -0,0 +1,87 @@
+"""
+Benchmark the order listing serialization paths.
+
+Times GET /orders/ through the app (in-process, no network) for the default
+path (ORM objects + response model) and the lean path (?fast=true: Core rows
++ orjson) at each page size, and checks both return the same JSON.
+Uses the configured database; with --seed, BENCH-* orders are upserted first
+so the largest page is full.
+
+    python benchmark_listing.py --seed --pages 100 1000 --repeat 20
+"""
+import argparse
+import logging
+import statistics
+import time
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from main import app
+from models import SessionLocal
+from repositories.customer_order_repository import CustomerOrderRepository
+
+logging.disable(logging.INFO)
+
+
+def seed_orders(count: int) -> None:
+    """Upsert count BENCH-* orders"""
+    db = SessionLocal()
+    try:
+        CustomerOrderRepository(db).upsert_many([
+            {
+                "order_number": f"BENCH-{i:06d}",
+                "customer_name": "Benchmark",
+                "requested_delivery_date": date(2026, 1, 1) + timedelta(days=i % 90),
+                "origin_country": "ZA",
+                "origin_state": "GAUTENG",
+                "destination_country": "ZA",
+                "destination_state": "KWAZULU-NATAL",
+                "gross_weight_kg": float(100 + i % 5000),
+                "vehicle_type_id": None,
+            }
+            for i in range(count)
+        ])
+    finally:
+        db.close()
+
+
+def time_requests(client: TestClient, url: str, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return timings
+
+
+def main(pages, repeat: int, seed: bool) -> None:
+    if seed:
+        seed_orders(max(pages))
+
+    with TestClient(app) as client:
+        print(f"{'page':>6} {'path':>8} {'median ms':>10} {'p95 ms':>8} {'rows/s':>10}")
+        for limit in pages:
+            default_url = f"/orders/?limit={limit}"
+            fast_url = f"{default_url}&fast=true"
+            rows = len(client.get(default_url).json())
+            if client.get(default_url).json() != client.get(fast_url).json():
+                raise SystemExit(f"Default and fast responses differ at limit={limit}")
+
+            for name, url in (("default", default_url), ("fast", fast_url)):
+                timings = sorted(time_requests(client, url, repeat))
+                median = statistics.median(timings)
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                print(f"{limit:>6} {name:>8} {median:>10.1f} {p95:>8.1f} {rows / median * 1000:>10.0f}")
+            if rows < limit:
+                print(f"       (only {rows} orders in the database; use --seed for full pages)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark order listing serialization")
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 1000], help="Page sizes (limit) to time")
+    parser.add_argument("--repeat", type=int, default=20, help="Requests per page size and path")
+    parser.add_argument("--seed", action="store_true", help="Upsert BENCH-* orders so the largest page is full")
+    args = parser.parse_args()
+    main(args.pages, args.repeat, args.seed)
@@ -0,0 +1,197 @@
+"""
+EXPLAIN-based regression check for the hot queries.
+
+Builds the statements the main endpoints and prediction runs issue (from the
+repository select builders), EXPLAINs them against the configured database
+and fails when one of them scans a large table instead of using its index,
+sorts a listing page instead of reading it in index order, or no longer uses
+the index it was tuned for. On PostgreSQL, sequential scans are disabled for
+the session so small development tables still show whether an index is usable,
+and any problem is a regression. SQLite's planner picks plans from table sizes
+and statistics that a development database does not have (a fresh one has
+none, a tiny one makes a full scan cheapest), so there the problems are only
+reported as warnings.
+
+    python check_query_plans.py        # exit code 1 on a regression (PostgreSQL)
+"""
+import json
+import re
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Set, Tuple, Union
+
+from sqlalchemy import select
+
+from models import SessionLocal
+from models.customer_order import CustomerOrder
+from models.destination_track import DestinationTrack
+from models.order_prediction import OrderPrediction
+from repositories.customer_order_repository import (
+    CustomerOrderRepository, listing_version_stamp_select, order_listing_select, order_page_select
+)
+from repositories.prediction_repository import latest_for_orders_select, latest_prediction_update
+
+# Tables that must never be read with a full scan by the checked queries
+LARGE_TABLES = {"customer_orders", "order_predictions", "destination_tracks"}
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    statement: object
+    # Index the query was tuned for (any of them, when several are acceptable)
+    expected_index: Union[str, Tuple[str, ...], None] = None
+    # Listing pages must come back in index order (no sort step)
+    ordered: bool = False
+
+
+@dataclass
+class Plan:
+    full_scans: Set[str]
+    indexes: Set[str]
+    sorts: bool
+    text: str
+
+
+def plan_checks(db) -> List[PlanCheck]:
+    dialect = db.get_bind().dialect.name
+    cursor = (datetime(2026, 1, 1), 1)
+    repo = CustomerOrderRepository(db)
+    return [
+        PlanCheck("orders page", order_page_select(limit=100), "ix_customer_orders_created_at_id", ordered=True),
+        PlanCheck(
+            "orders page after cursor", order_page_select(limit=100, after=cursor),
+            "ix_customer_orders_created_at_id", ordered=True
+        ),
+        PlanCheck(
+            "orders by status page", order_page_select(CustomerOrder.status == "pending", limit=100),
+            "ix_customer_orders_status_created_at_id", ordered=True
+        ),
+        PlanCheck(
+            "orders by vehicle type page", order_page_select(CustomerOrder.vehicle_type_id == 1, limit=100),
+            "ix_customer_orders_vehicle_type_created_at_id", ordered=True
+        ),
+        PlanCheck(
+            "orders listing rows", order_listing_select(limit=100, after=cursor),
+            "ix_customer_orders_created_at_id", ordered=True
+        ),
+        PlanCheck(
+            "order by number", select(CustomerOrder).where(CustomerOrder.order_number == "ORD-1"),
+            "ix_customer_orders_order_number"
+        ),
+        PlanCheck("listing version stamp", listing_version_stamp_select(), "ix_customer_orders_updated_at"),
+        PlanCheck(
+            "latest prediction per order", latest_for_orders_select(list(range(1, 101)), dialect),
+            "ix_order_predictions_order_id_created_at"
+        ),
+        PlanCheck(
+            "latest prediction for one order",
+            select(OrderPrediction).where(OrderPrediction.order_id == 1)
+            .order_by(OrderPrediction.created_at.desc()).limit(1),
+            "ix_order_predictions_order_id_created_at"
+        ),
+        PlanCheck(
+            "latest prediction columns update",
+            latest_prediction_update(list(range(1, 101)), dialect, datetime(2026, 1, 1)),
+            "ix_order_predictions_order_id_created_at"
+        ),
+        PlanCheck(
+            "open orders chunk",
+            repo._open_for_prediction_select([CustomerOrder.id])
+            .where(CustomerOrder.id > 0).order_by(CustomerOrder.id).limit(5000),
+            # SQLite may walk the rowid range instead, which is in id order as well
+            ("ix_customer_orders_open_id", "INTEGER PRIMARY KEY"), ordered=True
+        ),
+        PlanCheck(
+            "route lookup",
+            select(DestinationTrack).where(
+                DestinationTrack.origin_city == "JNB", DestinationTrack.destination_city == "LUN"
+            ),
+            "ix_destination_tracks_route"
+        ),
+    ]
+
+
+def explain_sqlite(connection, sql: str) -> Plan:
+    details = [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    full_scans = set()
+    indexes = set()
+    for detail in details:
+        scan = re.match(r"SCAN (\w+)", detail)
+        if scan and "INDEX" not in detail:
+            full_scans.add(scan.group(1))
+        index = re.search(r"USING (?:COVERING )?INDEX (\w+)", detail)
+        if index:
+            indexes.add(index.group(1))
+        elif "USING INTEGER PRIMARY KEY" in detail:
+            indexes.add("INTEGER PRIMARY KEY")
+    sorts = any("TEMP B-TREE FOR ORDER BY" in d for d in details)
+    return Plan(full_scans, indexes, sorts, "\n".join(details))
+
+
+def explain_postgresql(connection, sql: str) -> Plan:
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    full_scans, indexes, sorts = set(), set(), False
+
+    def walk(node, top_level: bool):
+        nonlocal sorts
+        if node["Node Type"] == "Seq Scan":
+            full_scans.add(node["Relation Name"])
+        if "Index Name" in node:
+            indexes.add(node["Index Name"])
+        # Only a sort feeding the final ORDER BY counts; window/DISTINCT ON sorts are subplans
+        if node["Node Type"] in ("Sort", "Incremental Sort") and top_level:
+            sorts = True
+        for child in node.get("Plans", []):
+            walk(child, top_level and node["Node Type"] in ("Limit", "Sort", "Incremental Sort"))
+
+    walk(plan[0]["Plan"], True)
+    return Plan(full_scans, indexes, sorts, json.dumps(plan[0]["Plan"], indent=1))
+
+
+def main() -> int:
+    db = SessionLocal()
+    failures = 0
+    warnings = 0
+    try:
+        connection = db.connection()
+        dialect = connection.dialect
+        strict = dialect.name == "postgresql"
+        explain = explain_postgresql if dialect.name == "postgresql" else explain_sqlite
+        for check in plan_checks(db):
+            sql = str(check.statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+            plan = explain(connection, sql)
+            problems = []
+            if plan.full_scans & LARGE_TABLES:
+                problems.append(f"full scan of {', '.join(sorted(plan.full_scans & LARGE_TABLES))}")
+            expected = (check.expected_index,) if isinstance(check.expected_index, str) else check.expected_index
+            if expected and not plan.indexes & set(expected):
+                problems.append(f"{' / '.join(expected)} not used")
+            if check.ordered and plan.sorts:
+                problems.append("sorts instead of reading in index order")
+
+            status = ("FAIL" if strict else "warn") if problems else "ok"
+            print(f"{status:>4}  {check.name}: {', '.join(problems) or ', '.join(sorted(plan.indexes))}")
+            if problems:
+                if strict:
+                    failures += 1
+                else:
+                    warnings += 1
+                print("      " + plan.text.replace("\n", "\n      "))
+        db.rollback()
+    finally:
+        db.close()
+    if failures:
+        print(f"{failures} regression(s)")
+    elif warnings:
+        print(f"{warnings} warning(s): {dialect.name} plans depend on table statistics; check on PostgreSQL")
+    else:
+        print("All query plans use their indexes")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
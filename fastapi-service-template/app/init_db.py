@@ -2,10 +2,15 @@
 Database initialization script with seed data
 Run this to populate initial vehicle types and customer orders from Excel
 """
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
 from models import SessionLocal, Base, engine
 from models.vehicle_type import VehicleType
 from models.customer_order import CustomerOrder
 from models.destination_track import DestinationTrack
+from predict.route_features import aggregate_route_week_features
+from repositories.route_week_feature_repository import RouteWeekFeatureRepository
 import pandas as pd
 from datetime import datetime, date
 import logging
@@ -266,14 +271,59 @@ def seed_destination_tracks(db):
         db.rollback()
 
 
+def seed_route_week_features(db):
+    """Build the route feature store - distance/weather means per route and ISO week"""
+    repo = RouteWeekFeatureRepository(db)
+    existing_count = repo.count()
+    if existing_count > 0:
+        logger.info(f"Route features already exist ({existing_count} records). Skipping.")
+        return
+
+    csv_paths = [
+        "/data/africa_all_with_weather_clean.csv",
+        "/data/south_africa_all_with_weather_clean.csv"
+    ]
+    frames = [pd.read_csv(path) for path in csv_paths if Path(path).exists()]
+    if not frames:
+        logger.warning(f"Shipment CSVs not found at {csv_paths}. Skipping route features.")
+        return
+
+    try:
+        # The datasets overlap; count each shipment once
+        df = pd.concat(frames, ignore_index=True).drop_duplicates(subset=['shipment_id'])
+        logger.info(f"Loaded {len(df)} shipment records for route features")
+
+        table = aggregate_route_week_features(df)
+        rows = table.astype(object).where(table.notna(), None).to_dict(orient='records')
+        repo.replace_all(rows)
+        logger.info(f"Successfully seeded {len(rows)} route feature rows")
+
+    except Exception as e:
+        logger.error(f"Error building route features: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+
+
+def run_migrations():
+    """Bring the schema to the latest Alembic revision"""
+    app_dir = Path(__file__).resolve().parent
+    config = Config(str(app_dir / "alembic.ini"))
+    config.set_main_option("script_location", str(app_dir / "migrations"))
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+
 def init_db():
     """Initialize database with seed data"""
     
     # Drop and recreate tables
     logger.info("Dropping existing tables...")
     Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
     logger.info("Creating fresh tables...")
-    Base.metadata.create_all(bind=engine)
+    run_migrations()
     logger.info("Database tables created")
     
     db = SessionLocal()
@@ -281,6 +331,7 @@ def init_db():
     try:
         seed_vehicle_types(db)
         seed_destination_tracks(db)
+        seed_route_week_features(db)
         seed_orders_from_excel(db)
         
     except Exception as e:
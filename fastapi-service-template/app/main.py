@@ -1,17 +1,20 @@
-from fastapi import FastAPI, Request, Response
-from starlette.background import BackgroundTask
+from fastapi import FastAPI
 import logging
+import os
 import json
 from pathlib import Path
 
 # Import database models and setup
-from models import Base, engine
+from models import engine, current_async_engine, dispose_async_engine
 
 # Import your routers here
 from routers.example import router as example_router
 from routers.orders import router as orders_router
 from routers.vehicle_types import router as vehicle_types_router
 from routers.predictions import router as predictions_router
+from predict.model_registry import model_registry
+from utils.pool_metrics import pool_stats
+from utils.request_logging import RequestLoggingMiddleware, start_request_log_listener
 
 app = FastAPI(
     title="LastMile API",
@@ -25,9 +28,7 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-logging.info("Database tables created successfully")
+# Tables are managed by Alembic migrations: run `alembic upgrade head` before starting the app
 
 # Include your routers here
 app.include_router(example_router)
@@ -36,38 +37,29 @@ app.include_router(vehicle_types_router)
 app.include_router(predictions_router)
 
 
-def log_info(req_body, res_body):
-    """Log request and response information"""
-    logging.info(f"Request: {req_body}")
-    logging.info(f"Response: {res_body}")
-
-
-async def set_body(request: Request, body: bytes):
-    """Helper to set body on request object"""
-    async def receive():
-        return {'type': 'http.request', 'body': body}
-    request._receive = receive
-
-
-@app.middleware('http')
-async def logging_middleware(request: Request, call_next):
-    """Middleware to log all requests and responses"""
-    req_body = await request.body()
-    await set_body(request, req_body)
-    response = await call_next(request)
-    
-    res_body = b''
-    async for chunk in response.body_iterator:
-        res_body += chunk
-    
-    task = BackgroundTask(log_info, req_body, res_body)
-    return Response(
-        content=res_body,
-        status_code=response.status_code,
-        headers=dict(response.headers),
-        media_type=response.media_type,
-        background=task
-    )
+# Metadata-only request logging (sampled, size-capped bodies with REQUEST_LOG_BODIES=true)
+app.add_middleware(RequestLoggingMiddleware)
+request_log_listener = None
+
+
+@app.on_event("startup")
+async def start_request_logging():
+    """Write request log records from a background thread"""
+    global request_log_listener
+    request_log_listener = start_request_log_listener()
+
+
+@app.on_event("shutdown")
+async def stop_request_logging():
+    """Flush queued request log records"""
+    if request_log_listener is not None:
+        request_log_listener.stop()
+
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    """Release the async engine's pooled connections"""
+    await dispose_async_engine()
 
 
 @app.get("/")
@@ -86,6 +78,21 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/health/pool")
+async def pool_health():
+    """
+    Database connection pool state for this worker process: size, checked-out / idle /
+    overflow connections and the checkout wait histogram, for the sync and async engines
+    (async is null until first used)
+    """
+    async_engine = current_async_engine()
+    return {
+        "pid": os.getpid(),
+        "sync": pool_stats(engine),
+        "async": pool_stats(async_engine.sync_engine) if async_engine is not None else None,
+    }
+
+
 @app.on_event("startup")
 async def save_openapi_spec():
     """Save OpenAPI specification to api.json on startup"""
@@ -99,6 +106,16 @@ async def save_openapi_spec():
         logging.error(f"Failed to save OpenAPI specification: {e}")
 
 
+@app.on_event("startup")
+async def load_prediction_models():
+    """Load prediction models once per worker so the first prediction run doesn't parse them"""
+    try:
+        for loaded in model_registry.load_all():
+            logging.info(f"Model '{loaded.name}' version {loaded.version} loaded")
+    except Exception as e:
+        logging.error(f"Failed to load prediction models: {e}")
+
+
 @app.get("/api.json")
 async def get_openapi_json():
     """Endpoint to retrieve the OpenAPI specification in JSON format"""
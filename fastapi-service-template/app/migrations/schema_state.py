@@ -0,0 +1,31 @@
+"""
+Schema checks for migrations.
+
+Databases created before migrations existed were built by create_all() at
+whatever point the models had reached, so the early revisions only create
+the tables, columns and indexes that are missing. Such a database goes
+straight to `alembic upgrade head`, no stamping needed. Offline (--sql) runs
+assume an empty database and emit the full DDL.
+"""
+import sqlalchemy as sa
+from alembic import context, op
+
+
+def has_table(table: str) -> bool:
+    if context.is_offline_mode():
+        return False
+    return sa.inspect(op.get_bind()).has_table(table)
+
+
+def has_column(table: str, column: str) -> bool:
+    return has_table(table) and column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def has_index(table: str, index: str) -> bool:
+    return has_table(table) and index in {i["name"] for i in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def create_index(name: str, table: str, columns, **kwargs) -> None:
+    """op.create_index unless the index already exists"""
+    if not has_index(table, name):
+        op.create_index(name, table, columns, **kwargs)
@@ -0,0 +1,116 @@
+"""Baseline schema: vehicle types, destination tracks, customer orders and order predictions
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.schema_state import create_index, has_table
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not has_table("vehicle_types"):
+        op.create_table(
+            "vehicle_types",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(100), nullable=False, comment="Vehicle type name (e.g., '8 TONNER', '12 TONNER')"),
+            sa.Column("max_weight_kg", sa.Float(), nullable=True, comment="Maximum weight capacity in kilograms"),
+            sa.Column("payload_ton", sa.Float(), nullable=True, comment="Payload capacity in tons"),
+            sa.Column("max_volume_m3", sa.Float(), nullable=True, comment="Maximum volume capacity in cubic meters"),
+            sa.Column("volume_m3", sa.Float(), nullable=True, comment="Volume in cubic meters"),
+            sa.Column("length_m", sa.Float(), nullable=True, comment="Length in meters"),
+            sa.Column("width_m", sa.Float(), nullable=True, comment="Width in meters"),
+            sa.Column("height_m", sa.Float(), nullable=True, comment="Height in meters"),
+            sa.Column("diesel", sa.Boolean(), nullable=True, comment="Whether this is a diesel vehicle"),
+            sa.Column("hybrid", sa.Boolean(), nullable=True, comment="Whether this is a hybrid vehicle"),
+            sa.Column("ev_van", sa.Boolean(), nullable=True, comment="Whether this is an electric van"),
+            sa.Column("ev_charge_time", sa.Float(), nullable=True, comment="EV charging time in hours"),
+            sa.Column("ev_range_km", sa.Float(), nullable=True, comment="EV range in kilometers"),
+            sa.Column("ev_energy_kwh_per_km", sa.Float(), nullable=True, comment="EV energy consumption in kWh per km"),
+            sa.Column("average_speed_kmh", sa.Float(), nullable=True, comment="Average speed in km/h"),
+            sa.Column("fuel_consumption_per_100km", sa.Float(), nullable=True, comment="Fuel consumption per 100km"),
+            sa.Column("diesel_l_per_km", sa.Float(), nullable=True, comment="Diesel consumption in liters per km"),
+            sa.Column("emission_factor_kg_per_km", sa.Float(), nullable=True, comment="Base CO2 emission factor in kg per km (varies by fuel type)"),
+            sa.Column("cost_per_km", sa.Float(), nullable=True, comment="Operating cost per kilometer"),
+            sa.Column("diesel_cost_zar_per_km", sa.Float(), nullable=True, comment="Diesel operating cost in ZAR per km"),
+            sa.Column("ev_cost_zar_per_km_ac", sa.Float(), nullable=True, comment="EV operating cost in ZAR per km (AC charging)"),
+            sa.Column("ev_cost_zar_per_km_dc", sa.Float(), nullable=True, comment="EV operating cost in ZAR per km (DC charging)"),
+            sa.Column("daily_rental_cost", sa.Float(), nullable=True, comment="Daily rental cost"),
+            sa.Column("is_active", sa.Boolean(), nullable=False, comment="Whether this vehicle type is currently available"),
+            sa.Column("description", sa.Text(), nullable=True, comment="Additional notes about this vehicle type"),
+        )
+    create_index("ix_vehicle_types_id", "vehicle_types", ["id"])
+    create_index("ix_vehicle_types_name", "vehicle_types", ["name"], unique=True)
+
+    if not has_table("destination_tracks"):
+        op.create_table(
+            "destination_tracks",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("origin_country", sa.String(10), nullable=False, comment="Origin country code"),
+            sa.Column("origin_city", sa.String(100), nullable=False, comment="Origin city code/name"),
+            sa.Column("destination_country", sa.String(10), nullable=False, comment="Destination country code"),
+            sa.Column("destination_city", sa.String(100), nullable=False, comment="Destination city code/name"),
+            sa.Column("distance_km", sa.Float(), nullable=True, comment="Route distance in kilometers"),
+            sa.Column("origin_temp_mean", sa.Float(), nullable=True, comment="Average origin temperature (°C)"),
+            sa.Column("dest_temp_mean", sa.Float(), nullable=True, comment="Average destination temperature (°C)"),
+        )
+    for column in ("id", "origin_country", "origin_city", "destination_country", "destination_city", "distance_km"):
+        create_index(f"ix_destination_tracks_{column}", "destination_tracks", [column])
+
+    if not has_table("customer_orders"):
+        op.create_table(
+            "customer_orders",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("order_number", sa.String(100), nullable=False),
+            sa.Column("customer_name", sa.String(255), nullable=True, comment="Customer Name from Excel"),
+            sa.Column("requested_delivery_date", sa.Date(), nullable=False, comment="Customer requested delivery date (YYYYMMDD format in Excel)"),
+            sa.Column("line_item_count", sa.Integer(), nullable=True, comment="Number of line items aggregated for this order"),
+            sa.Column("origin_country", sa.String(100), nullable=True, comment="From Country"),
+            sa.Column("origin_state", sa.String(100), nullable=True, comment="From stare (state) - origin state/region"),
+            sa.Column("destination_country", sa.String(100), nullable=True, comment="To country"),
+            sa.Column("destination_state", sa.String(100), nullable=True, comment="To State - destination state/region"),
+            sa.Column("gross_weight_kg", sa.Float(), nullable=True, comment="Total gross weight aggregated from all line items"),
+            sa.Column("net_weight_kg", sa.Float(), nullable=True, comment="Total net weight aggregated from all line items"),
+            sa.Column("total_width", sa.Float(), nullable=True, comment="Total width aggregated from all line items"),
+            sa.Column("delivery_method", sa.Integer(), nullable=True, comment="Delivery method code from Excel (40=40ft, 20=20ft)"),
+            sa.Column("vehicle_type_id", sa.Integer(), sa.ForeignKey("vehicle_types.id"), nullable=True),
+            sa.Column("lead_time_days", sa.Integer(), nullable=True, comment="Expected lead time in days"),
+            sa.Column("load_date", sa.Date(), nullable=True, comment="Date when cargo is loaded"),
+            sa.Column("estimated_arrival", sa.Date(), nullable=True, comment="Estimated arrival date"),
+            sa.Column("notes", sa.Text(), nullable=True),
+            sa.Column("status", sa.String(50), nullable=True, comment="Order status: pending, confirmed, in_transit, delivered, cancelled"),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+    create_index("ix_customer_orders_id", "customer_orders", ["id"])
+    create_index("ix_customer_orders_order_number", "customer_orders", ["order_number"], unique=True)
+
+    if not has_table("order_predictions"):
+        op.create_table(
+            "order_predictions",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("order_id", sa.Integer(), sa.ForeignKey("customer_orders.id"), nullable=False),
+            sa.Column("recommended_vehicle_type_id", sa.Integer(), sa.ForeignKey("vehicle_types.id"), nullable=True),
+            sa.Column("destination_track_id", sa.Integer(), sa.ForeignKey("destination_tracks.id"), nullable=True, comment="Route used for this prediction"),
+            sa.Column("expected_lead_time_days", sa.Float(), nullable=True, comment="Expected lead time in days (95% confidence upper bound for on-time delivery)"),
+            sa.Column("predicted_co2_kg", sa.Float(), nullable=True, comment="Predicted CO2 emissions in kg for this route/vehicle combination"),
+            sa.Column("confidence", sa.Float(), nullable=True, comment="Model confidence score (0-1)"),
+            sa.Column("recommended_booking_date", sa.Date(), nullable=True, comment="Recommended booking date (requested_arrival - expected_lead_time)"),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+    for column in ("id", "order_id", "recommended_vehicle_type_id", "destination_track_id"):
+        create_index(f"ix_order_predictions_{column}", "order_predictions", [column])
+
+
+def downgrade() -> None:
+    op.drop_table("order_predictions")
+    op.drop_table("customer_orders")
+    op.drop_table("destination_tracks")
+    op.drop_table("vehicle_types")
@@ -0,0 +1,82 @@
+"""Prediction pipeline: model_version on predictions, prediction jobs, prediction cache, route features
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.schema_state import create_index, has_column, has_table
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not has_column("order_predictions", "model_version"):
+        op.add_column(
+            "order_predictions",
+            sa.Column("model_version", sa.String(64), nullable=True, comment="Model registry version(s) used for this prediction")
+        )
+
+    if not has_table("prediction_jobs"):
+        op.create_table(
+            "prediction_jobs",
+            sa.Column("id", sa.String(32), primary_key=True, comment="Job id returned by POST /predictions/run"),
+            sa.Column("status", sa.String(20), nullable=False, comment="Job status: queued, running, succeeded, failed"),
+            sa.Column("full", sa.Boolean(), nullable=False, comment="Whether every open order is re-scored (otherwise incremental)"),
+            sa.Column("orders_scored", sa.Integer(), nullable=False, comment="Orders scored so far"),
+            sa.Column("orders_total", sa.Integer(), nullable=True, comment="Orders selected for this run"),
+            sa.Column("error", sa.Text(), nullable=True, comment="Error message if the run failed"),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("started_at", sa.DateTime(), nullable=True),
+            sa.Column("finished_at", sa.DateTime(), nullable=True),
+            sa.Column("heartbeat_at", sa.DateTime(), nullable=True, comment="Last progress update; stale running jobs are treated as abandoned"),
+        )
+    create_index("ix_prediction_jobs_status", "prediction_jobs", ["status"])
+
+    if not has_table("prediction_cache"):
+        op.create_table(
+            "prediction_cache",
+            sa.Column("model_version", sa.String(64), primary_key=True, comment="Model version the output was scored with"),
+            sa.Column("feature_hash", sa.BigInteger(), primary_key=True, comment="64-bit hash of the feature row (signed)"),
+            sa.Column("lead_time", sa.Float(), nullable=False, comment="Point prediction (days)"),
+            sa.Column("lead_time_lower", sa.Float(), nullable=True, comment="p2.5 prediction (days)"),
+            sa.Column("lead_time_upper", sa.Float(), nullable=False, comment="p97.5 prediction - the expected lead time (days)"),
+            sa.Column("confidence", sa.Float(), nullable=True, comment="Confidence derived from the p2.5-p97.5 interval width"),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+
+    if not has_table("route_week_features"):
+        op.create_table(
+            "route_week_features",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("origin_city", sa.String(100), nullable=False, comment="Origin city code (normalized)"),
+            sa.Column("destination_city", sa.String(100), nullable=False, comment="Destination city code (normalized)"),
+            sa.Column("iso_week", sa.Integer(), nullable=False, comment="ISO week of shipment, 0 = all weeks (route-level fallback)"),
+            sa.Column("shipments", sa.Integer(), nullable=False, comment="Historical shipments aggregated into this row"),
+            sa.Column("distance_km", sa.Float(), nullable=True, comment="Mean route distance in kilometers"),
+            sa.Column("average_distance_per_day", sa.Float(), nullable=True, comment="Mean kilometers covered per transit day"),
+            sa.Column("origin_temp_mean", sa.Float(), nullable=True, comment="Mean origin temperature (°C)"),
+            sa.Column("origin_temp_max", sa.Float(), nullable=True, comment="Mean daily max origin temperature (°C)"),
+            sa.Column("origin_temp_min", sa.Float(), nullable=True, comment="Mean daily min origin temperature (°C)"),
+            sa.Column("origin_precip_mm", sa.Float(), nullable=True, comment="Mean origin precipitation (mm)"),
+            sa.Column("dest_temp_mean", sa.Float(), nullable=True, comment="Mean destination temperature (°C)"),
+            sa.Column("dest_temp_max", sa.Float(), nullable=True, comment="Mean daily max destination temperature (°C)"),
+            sa.Column("dest_temp_min", sa.Float(), nullable=True, comment="Mean daily min destination temperature (°C)"),
+            sa.Column("dest_precip_mm", sa.Float(), nullable=True, comment="Mean destination precipitation (mm)"),
+            sa.UniqueConstraint("origin_city", "destination_city", "iso_week", name="uq_route_week_features_route_week"),
+        )
+    create_index("ix_route_week_features_id", "route_week_features", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("route_week_features")
+    op.drop_table("prediction_cache")
+    op.drop_index("ix_prediction_jobs_status", table_name="prediction_jobs")
+    op.drop_table("prediction_jobs")
+    with op.batch_alter_table("order_predictions") as batch:
+        batch.drop_column("model_version")
@@ -0,0 +1,40 @@
+"""Order listing: keyset pagination indexes and vehicle_types.updated_at for ETags
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.schema_state import create_index, has_column
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index("ix_customer_orders_created_at_id", "customer_orders", ["created_at", "id"])
+    create_index("ix_customer_orders_status_created_at_id", "customer_orders", ["status", "created_at", "id"])
+    create_index(
+        "ix_customer_orders_vehicle_type_created_at_id", "customer_orders", ["vehicle_type_id", "created_at", "id"]
+    )
+
+    if not has_column("vehicle_types", "updated_at"):
+        op.add_column(
+            "vehicle_types",
+            sa.Column("updated_at", sa.DateTime(), nullable=True, comment="Last change; part of the listing ETags")
+        )
+        op.execute(sa.text("UPDATE vehicle_types SET updated_at = CURRENT_TIMESTAMP"))
+        with op.batch_alter_table("vehicle_types") as batch:
+            batch.alter_column("updated_at", existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("vehicle_types") as batch:
+        batch.drop_column("updated_at")
+    op.drop_index("ix_customer_orders_vehicle_type_created_at_id", table_name="customer_orders")
+    op.drop_index("ix_customer_orders_status_created_at_id", table_name="customer_orders")
+    op.drop_index("ix_customer_orders_created_at_id", table_name="customer_orders")
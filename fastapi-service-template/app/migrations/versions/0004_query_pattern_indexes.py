@@ -0,0 +1,45 @@
+"""Indexes for the hot query patterns
+
+- customer_orders: partial index on id for open statuses (prediction runs page
+  WHERE status IN (...) AND id > last_id ORDER BY id) and updated_at (max() in
+  the listing ETag stamp)
+- order_predictions: (order_id, created_at DESC, id DESC) for the latest
+  prediction per order
+- destination_tracks: (origin_city, destination_city) route lookups
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.schema_state import create_index
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Predicate of ix_customer_orders_open_id as shipped (models.customer_order.OPEN_STATUS_FILTER at this revision)
+OPEN_STATUS_FILTER = "status IN ('pending', 'confirmed', 'in_transit')"
+
+
+def upgrade() -> None:
+    create_index(
+        "ix_customer_orders_open_id", "customer_orders", ["id"],
+        postgresql_where=sa.text(OPEN_STATUS_FILTER), sqlite_where=sa.text(OPEN_STATUS_FILTER)
+    )
+    create_index("ix_customer_orders_updated_at", "customer_orders", ["updated_at"])
+    create_index(
+        "ix_order_predictions_order_id_created_at", "order_predictions",
+        ["order_id", sa.text("created_at DESC"), sa.text("id DESC")]
+    )
+    create_index("ix_destination_tracks_route", "destination_tracks", ["origin_city", "destination_city"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_destination_tracks_route", table_name="destination_tracks")
+    op.drop_index("ix_order_predictions_order_id_created_at", table_name="order_predictions")
+    op.drop_index("ix_customer_orders_updated_at", table_name="customer_orders")
+    op.drop_index("ix_customer_orders_open_id", table_name="customer_orders")
@@ -0,0 +1,53 @@
+"""Latest prediction columns on customer_orders
+
+Each order carries a copy of its latest order_predictions row (latest_*
+columns) so order listings read one table. The prediction writers keep them
+in step; this revision backfills them from the existing predictions.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+# order_predictions column -> customer_orders column, with its type
+LATEST_COLUMNS = [
+    ("id", "latest_prediction_id", sa.Integer()),
+    ("expected_lead_time_days", "latest_expected_lead_time_days", sa.Float()),
+    ("predicted_co2_kg", "latest_predicted_co2_kg", sa.Float()),
+    ("recommended_vehicle_type_id", "latest_recommended_vehicle_type_id", sa.Integer()),
+    ("destination_track_id", "latest_destination_track_id", sa.Integer()),
+    ("confidence", "latest_confidence", sa.Float()),
+    ("recommended_booking_date", "latest_recommended_booking_date", sa.Date()),
+    ("model_version", "latest_model_version", sa.String(length=64)),
+    ("created_at", "latest_prediction_created_at", sa.DateTime()),
+]
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("customer_orders") as batch:
+        for _, column, type_ in LATEST_COLUMNS:
+            comment = "ID of the latest order_predictions row" if column == "latest_prediction_id" else None
+            batch.add_column(sa.Column(column, type_, nullable=True, comment=comment))
+
+    # Latest = newest created_at, then highest id; UPDATE ... FROM works on PostgreSQL and SQLite 3.33+
+    assignments = ", ".join(f"{column} = latest.{source}" for source, column, _ in LATEST_COLUMNS)
+    sources = ", ".join(source for source, _, _ in LATEST_COLUMNS)
+    op.execute(sa.text(
+        f"UPDATE customer_orders SET {assignments} "
+        f"FROM (SELECT order_id, {sources}, row_number() OVER "
+        f"(PARTITION BY order_id ORDER BY created_at DESC, id DESC) AS rank FROM order_predictions) AS latest "
+        f"WHERE latest.order_id = customer_orders.id AND latest.rank = 1"
+    ))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("customer_orders") as batch:
+        for _, column, _ in reversed(LATEST_COLUMNS):
+            batch.drop_column(column)
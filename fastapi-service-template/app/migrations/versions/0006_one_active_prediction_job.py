@@ -0,0 +1,37 @@
+"""At most one queued/running prediction job
+
+Unique partial index over prediction_jobs rows in an active status. Before it
+is created, extra active jobs left by concurrent submits are marked failed,
+keeping the oldest (the one get_active() reports).
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# Active statuses as shipped (models.prediction_job.ACTIVE_JOB_FILTER at this revision)
+ACTIVE_JOB_FILTER = "status IN ('queued', 'running')"
+
+
+def upgrade() -> None:
+    op.execute(sa.text(
+        f"UPDATE prediction_jobs SET status = 'failed', error = 'Superseded by an earlier active job', "
+        f"finished_at = CURRENT_TIMESTAMP "
+        f"WHERE {ACTIVE_JOB_FILTER} AND id <> ("
+        f"SELECT id FROM prediction_jobs WHERE {ACTIVE_JOB_FILTER} ORDER BY created_at, id LIMIT 1)"
+    ))
+    op.create_index(
+        "uq_prediction_jobs_one_active", "prediction_jobs", [sa.text(f"({ACTIVE_JOB_FILTER})")], unique=True,
+        postgresql_where=sa.text(ACTIVE_JOB_FILTER), sqlite_where=sa.text(ACTIVE_JOB_FILTER)
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_prediction_jobs_one_active", table_name="prediction_jobs")
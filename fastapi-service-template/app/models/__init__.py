@@ -1,7 +1,10 @@
-from .database import Base, engine, SessionLocal, get_db
+from .database import Base, engine, SessionLocal, get_db, get_async_engine, AsyncSessionLocal, get_async_db, current_async_engine, dispose_async_engine
 from .vehicle_type import VehicleType
 from .destination_track import DestinationTrack
 from .customer_order import CustomerOrder
 from .order_prediction import OrderPrediction
+from .prediction_job import PredictionJob
+from .prediction_cache_entry import PredictionCacheEntry
+from .route_week_feature import RouteWeekFeature
 
-__all__ = ["Base", "engine", "SessionLocal", "get_db", "VehicleType", "DestinationTrack", "CustomerOrder", "OrderPrediction"]
+__all__ = ["Base", "engine", "SessionLocal", "get_db", "get_async_engine", "AsyncSessionLocal", "get_async_db", "current_async_engine", "dispose_async_engine", "VehicleType", "DestinationTrack", "CustomerOrder", "OrderPrediction", "PredictionJob", "PredictionCacheEntry", "RouteWeekFeature"]
@@ -1,12 +1,44 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Date
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Date, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from typing import Optional
 from .database import Base
 
 
+# Orders with these statuses are scored by prediction runs
+OPEN_STATUSES = ['pending', 'confirmed', 'in_transit']
+OPEN_STATUS_FILTER = f"status IN ({', '.join(repr(s) for s in OPEN_STATUSES)})"
+
+# order_predictions column -> customer_orders column holding it for the order's latest prediction
+LATEST_PREDICTION_COLUMNS = {
+    "id": "latest_prediction_id",
+    "expected_lead_time_days": "latest_expected_lead_time_days",
+    "predicted_co2_kg": "latest_predicted_co2_kg",
+    "recommended_vehicle_type_id": "latest_recommended_vehicle_type_id",
+    "destination_track_id": "latest_destination_track_id",
+    "confidence": "latest_confidence",
+    "recommended_booking_date": "latest_recommended_booking_date",
+    "model_version": "latest_model_version",
+    "created_at": "latest_prediction_created_at",
+}
+
+
 class CustomerOrder(Base):
     """Customer Order model for tracking shipment orders - based on open_orders.xlsx structure"""
     __tablename__ = "customer_orders"
+    __table_args__ = (
+        # Keyset pagination: WHERE (created_at, id) > cursor ORDER BY created_at, id
+        Index("ix_customer_orders_created_at_id", "created_at", "id"),
+        Index("ix_customer_orders_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_customer_orders_vehicle_type_created_at_id", "vehicle_type_id", "created_at", "id"),
+        # Prediction runs: WHERE status IN OPEN_STATUSES AND id > last_id ORDER BY id
+        Index(
+            "ix_customer_orders_open_id", "id",
+            postgresql_where=text(OPEN_STATUS_FILTER), sqlite_where=text(OPEN_STATUS_FILTER)
+        ),
+        # max(updated_at) in the listing ETag stamp
+        Index("ix_customer_orders_updated_at", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order_number = Column(String(100), unique=True, nullable=False, index=True)
@@ -46,6 +78,17 @@ class CustomerOrder(Base):
     load_date = Column(Date, nullable=True, comment="Date when cargo is loaded")
     estimated_arrival = Column(Date, nullable=True, comment="Estimated arrival date")
     
+    # Latest prediction (read model for listings), kept in step by the prediction writers
+    latest_prediction_id = Column(Integer, nullable=True, comment="ID of the latest order_predictions row")
+    latest_expected_lead_time_days = Column(Float, nullable=True)
+    latest_predicted_co2_kg = Column(Float, nullable=True)
+    latest_recommended_vehicle_type_id = Column(Integer, nullable=True)
+    latest_destination_track_id = Column(Integer, nullable=True)
+    latest_confidence = Column(Float, nullable=True)
+    latest_recommended_booking_date = Column(Date, nullable=True)
+    latest_model_version = Column(String(64), nullable=True)
+    latest_prediction_created_at = Column(DateTime, nullable=True)
+
     # Additional information
     notes = Column(Text, nullable=True)
     status = Column(String(50), nullable=True, default="pending", comment="Order status: pending, confirmed, in_transit, delivered, cancelled")
@@ -54,5 +97,14 @@ class CustomerOrder(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    @property
+    def last_prediction(self) -> Optional[dict]:
+        """The latest prediction as held in the latest_* columns (None if the order has none)"""
+        if self.latest_prediction_id is None:
+            return None
+        prediction = {field: getattr(self, column) for field, column in LATEST_PREDICTION_COLUMNS.items()}
+        prediction["order_id"] = self.id
+        return prediction
+
     def __repr__(self):
         return f"<CustomerOrder(id={self.id}, order_number='{self.order_number}', status='{self.status}')>"
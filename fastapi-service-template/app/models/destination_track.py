@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Integer, String, Float, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -6,6 +6,10 @@ from .database import Base
 class DestinationTrack(Base):
     """Destination Track model for route information (distances, locations, weather)"""
     __tablename__ = "destination_tracks"
+    __table_args__ = (
+        # Route lookups by (origin_city, destination_city)
+        Index("ix_destination_tracks_route", "origin_city", "destination_city"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, DateTime, Date, ForeignKey
+from sqlalchemy import Column, Integer, Float, DateTime, Date, ForeignKey, String, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -29,7 +29,17 @@ class OrderPrediction(Base):
     # Calculated booking time
     recommended_booking_date = Column(Date, nullable=True, comment="Recommended booking date (requested_arrival - expected_lead_time)")
 
+    # Version of the model(s) that produced this prediction - used by incremental runs
+    model_version = Column(String(64), nullable=True, comment="Model registry version(s) used for this prediction")
+
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     def __repr__(self):
         return f"<OrderPrediction(id={self.id}, order_id={self.order_id}, vehicle_id={self.recommended_vehicle_type_id}, track_id={self.destination_track_id}, lead_time={self.expected_lead_time_days}d)>"
+
+
+# Latest prediction per order: WHERE order_id ... ORDER BY created_at DESC, id DESC
+Index(
+    "ix_order_predictions_order_id_created_at",
+    OrderPrediction.order_id, OrderPrediction.created_at.desc(), OrderPrediction.id.desc()
+)
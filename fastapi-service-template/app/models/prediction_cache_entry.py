@@ -0,0 +1,22 @@
+from sqlalchemy import Column, BigInteger, String, Float, DateTime
+from datetime import datetime
+from .database import Base
+
+
+class PredictionCacheEntry(Base):
+    """Shared tier of the prediction cache: model output per (model version, feature row hash)"""
+    __tablename__ = "prediction_cache"
+
+    model_version = Column(String(64), primary_key=True, comment="Model version the output was scored with")
+    feature_hash = Column(BigInteger, primary_key=True, comment="64-bit hash of the feature row (signed)")
+
+    # Model output
+    lead_time = Column(Float, nullable=False, comment="Point prediction (days)")
+    lead_time_lower = Column(Float, nullable=True, comment="p2.5 prediction (days)")
+    lead_time_upper = Column(Float, nullable=False, comment="p97.5 prediction - the expected lead time (days)")
+    confidence = Column(Float, nullable=True, comment="Confidence derived from the p2.5-p97.5 interval width")
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<PredictionCacheEntry(model_version='{self.model_version}', feature_hash={self.feature_hash})>"
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index, text
+from datetime import datetime
+from .database import Base
+
+
+# A job in one of these statuses holds the single active-run slot
+ACTIVE_JOB_STATUSES = ['queued', 'running']
+ACTIVE_JOB_FILTER = f"status IN ({', '.join(repr(s) for s in ACTIVE_JOB_STATUSES)})"
+
+
+class PredictionJob(Base):
+    """Background prediction run - shared across workers so any of them can report its state"""
+    __tablename__ = "prediction_jobs"
+    __table_args__ = (
+        # At most one queued/running job across all workers: the indexed expression is
+        # true for every row the partial index covers, so a second active row conflicts
+        Index(
+            "uq_prediction_jobs_one_active", text(f"({ACTIVE_JOB_FILTER})"), unique=True,
+            postgresql_where=text(ACTIVE_JOB_FILTER), sqlite_where=text(ACTIVE_JOB_FILTER)
+        ),
+    )
+
+    id = Column(String(32), primary_key=True, comment="Job id returned by POST /predictions/run")
+    status = Column(String(20), nullable=False, default="queued", index=True, comment="Job status: queued, running, succeeded, failed")
+    full = Column(Boolean, nullable=False, default=False, comment="Whether every open order is re-scored (otherwise incremental)")
+
+    # Progress
+    orders_scored = Column(Integer, nullable=False, default=0, comment="Orders scored so far")
+    orders_total = Column(Integer, nullable=True, comment="Orders selected for this run")
+    error = Column(Text, nullable=True, comment="Error message if the run failed")
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True, comment="Last progress update; stale running jobs are treated as abandoned")
+
+    def __repr__(self):
+        return f"<PredictionJob(id='{self.id}', status='{self.status}', scored={self.orders_scored}/{self.orders_total})>"
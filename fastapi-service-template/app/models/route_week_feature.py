@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, Float, UniqueConstraint
+from .database import Base
+
+
+class RouteWeekFeature(Base):
+    """Route feature store: historical distance and weather means per route and ISO week"""
+    __tablename__ = "route_week_features"
+    __table_args__ = (
+        UniqueConstraint("origin_city", "destination_city", "iso_week", name="uq_route_week_features_route_week"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Key - cities are normalized (trimmed, upper case) like RouteResolver keys
+    origin_city = Column(String(100), nullable=False, comment="Origin city code (normalized)")
+    destination_city = Column(String(100), nullable=False, comment="Destination city code (normalized)")
+    iso_week = Column(Integer, nullable=False, comment="ISO week of shipment, 0 = all weeks (route-level fallback)")
+    shipments = Column(Integer, nullable=False, comment="Historical shipments aggregated into this row")
+
+    # Route features (same names as the training features)
+    distance_km = Column(Float, nullable=True, comment="Mean route distance in kilometers")
+    average_distance_per_day = Column(Float, nullable=True, comment="Mean kilometers covered per transit day")
+    origin_temp_mean = Column(Float, nullable=True, comment="Mean origin temperature (°C)")
+    origin_temp_max = Column(Float, nullable=True, comment="Mean daily max origin temperature (°C)")
+    origin_temp_min = Column(Float, nullable=True, comment="Mean daily min origin temperature (°C)")
+    origin_precip_mm = Column(Float, nullable=True, comment="Mean origin precipitation (mm)")
+    dest_temp_mean = Column(Float, nullable=True, comment="Mean destination temperature (°C)")
+    dest_temp_max = Column(Float, nullable=True, comment="Mean daily max destination temperature (°C)")
+    dest_temp_min = Column(Float, nullable=True, comment="Mean daily min destination temperature (°C)")
+    dest_precip_mm = Column(Float, nullable=True, comment="Mean destination precipitation (mm)")
+
+    def __repr__(self):
+        return f"<RouteWeekFeature({self.origin_city} -> {self.destination_city}, week={self.iso_week}, n={self.shipments})>"
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, Text, Boolean, DateTime
 from sqlalchemy.orm import relationship
+from datetime import datetime
 from .database import Base
 
 
@@ -47,6 +48,9 @@ class VehicleType(Base):
     
     # Additional information
     description = Column(Text, nullable=True, comment="Additional notes about this vehicle type")
+
+    # Timestamps
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, comment="Last change; part of the listing ETags")
     
     # Relationships
     customer_orders = relationship("CustomerOrder", back_populates="vehicle_type")
@@ -0,0 +1,134 @@
+"""
+Columnar feature extraction for the lead time models.
+
+Orders are read as plain columns (ORDER_SOURCE_COLUMNS, selected with a Core
+select() for batch runs, or gathered from request objects for online scoring)
+and turned into the typed feature matrix in one vectorized pass: ship_* from
+load_date with datetime ops, categorical features as strings, numeric
+features as float64, route distance/weather merged from the route feature
+store. Batch runs and the online endpoint share build_features().
+"""
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from models.customer_order import CustomerOrder
+from predict.route_features import ROUTE_FEATURES, RouteFeatureStore
+
+# Features that were used in training (best-effort matching)
+CAT_FEATURES = [
+    'origin_country', 'origin_city', 'destination_country', 'destination_city',
+    'ship_dow', 'vessel', 'flight_voyage', 'weight_uq', 'volume_uq'
+]
+NUM_FEATURES = [
+    'ship_year', 'ship_month', 'ship_week',
+    'distance_km', 'leadtime_expected_days', 'average_distance_per_day',
+    'weight', 'volume',
+    'origin_temp_mean', 'origin_temp_max', 'origin_temp_min', 'origin_precip_mm',
+    'dest_temp_mean', 'dest_temp_max', 'dest_temp_min', 'dest_precip_mm'
+]
+FEATURE_COLS = CAT_FEATURES + NUM_FEATURES
+CAT_FEATURE_INDICES = [FEATURE_COLS.index(c) for c in CAT_FEATURES]
+
+# Order columns read for scoring (features plus what the prediction row needs)
+ORDER_SOURCE_COLUMNS = [
+    CustomerOrder.id,
+    CustomerOrder.origin_country,
+    CustomerOrder.origin_state,
+    CustomerOrder.destination_country,
+    CustomerOrder.destination_state,
+    CustomerOrder.gross_weight_kg,
+    CustomerOrder.lead_time_days,
+    CustomerOrder.load_date,
+    CustomerOrder.requested_delivery_date,
+]
+ORDER_SOURCE_FIELDS = [c.key for c in ORDER_SOURCE_COLUMNS]
+
+# Feature <- order column; origin/destination_state stand in for the training cities
+_CAT_SOURCES = {
+    'origin_country': 'origin_country',
+    'origin_city': 'origin_state',
+    'destination_country': 'destination_country',
+    'destination_city': 'destination_state',
+}
+_NUM_SOURCES = {
+    'leadtime_expected_days': 'lead_time_days',
+    'weight': 'gross_weight_kg',
+}
+
+
+def source_frame_from_rows(rows: Sequence[Sequence[Any]]) -> pd.DataFrame:
+    """
+    Order source frame from result rows of select(*ORDER_SOURCE_COLUMNS).
+    Columns stay object dtype so missing values are None and dates stay dates.
+    """
+    return pd.DataFrame(list(rows), columns=ORDER_SOURCE_FIELDS, dtype=object)
+
+
+def source_frame_from_objects(orders: Iterable[Any]) -> pd.DataFrame:
+    """
+    Order source frame from CustomerOrder rows or any object with the same
+    attributes (e.g. PredictionScoreRequest). Missing attributes become None.
+    """
+    orders = list(orders)
+    return pd.DataFrame(
+        {field: [getattr(o, field, None) for o in orders] for field in ORDER_SOURCE_FIELDS},
+        columns=ORDER_SOURCE_FIELDS,
+        dtype=object
+    )
+
+
+def _categorical(values) -> np.ndarray:
+    """Strings for CatBoost; missing values become ''"""
+    series = pd.Series(values, dtype=object)
+    return series.where(series.notna(), "").astype(str).to_numpy(dtype=object)
+
+
+def _numeric(values) -> np.ndarray:
+    """float64; missing or unparseable values become 0"""
+    return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").astype(float).fillna(0.0).to_numpy()
+
+
+def build_features(source: pd.DataFrame, route_features: Optional[RouteFeatureStore] = None) -> pd.DataFrame:
+    """
+    Typed feature matrix (columns in FEATURE_COLS order) for an order source frame.
+    Distance and weather come from the route feature store (by route and load week) when given.
+    Features that remain unknown are '' (categorical) or 0 (numeric).
+    """
+    n = len(source)
+    index = pd.RangeIndex(n)
+    columns = {}
+
+    # ship_* from load_date; day names match the training data ("Monday", ...)
+    load_dates = pd.to_datetime(pd.Series(source["load_date"].to_numpy(), index=index), errors="coerce")
+    ship_dow = load_dates.dt.day_name()
+    ship_numeric = {
+        'ship_year': load_dates.dt.year,
+        'ship_month': load_dates.dt.month,
+        'ship_week': load_dates.dt.isocalendar().week,
+    }
+
+    for col in CAT_FEATURES:
+        if col in _CAT_SOURCES:
+            columns[col] = _categorical(source[_CAT_SOURCES[col]].to_numpy())
+        elif col == 'ship_dow':
+            columns[col] = _categorical(ship_dow.to_numpy())
+        else:
+            columns[col] = np.full(n, "", dtype=object)
+
+    route = None
+    if route_features is not None:
+        route = route_features.lookup(source["origin_state"], source["destination_state"], ship_numeric['ship_week'])
+
+    for col in NUM_FEATURES:
+        if col in _NUM_SOURCES:
+            columns[col] = _numeric(source[_NUM_SOURCES[col]].to_numpy())
+        elif col in ship_numeric:
+            columns[col] = _numeric(ship_numeric[col].to_numpy(dtype=float, na_value=np.nan))
+        elif route is not None and col in ROUTE_FEATURES:
+            columns[col] = _numeric(route[col].to_numpy())
+        else:
+            columns[col] = np.zeros(n, dtype=float)
+
+    return pd.DataFrame(columns, index=index, columns=FEATURE_COLS)
@@ -0,0 +1,165 @@
+"""
+Process-wide registry of prediction models.
+
+Each registered model is parsed from disk once per process and kept resident.
+Lookups stat the file at most every MODEL_CHECK_INTERVAL_SECONDS; when the
+mtime/size changed and the content hash differs, the new version is loaded
+in full and swapped in atomically, so a worker picks up a redeployed model
+without a restart. Callers holding the previous LoadedModel keep using it.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MODEL_CHECK_INTERVAL_SECONDS = float(os.getenv("MODEL_CHECK_INTERVAL_SECONDS", "5"))
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """A model resident in memory together with the file version it came from"""
+    name: str
+    path: Path
+    model: Any
+    version: str
+    file_mtime: float
+    file_size: int
+    loaded_at: datetime
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "path": str(self.path),
+            "version": self.version,
+            "file_modified_at": datetime.utcfromtimestamp(self.file_mtime).isoformat(),
+            "loaded_at": self.loaded_at.isoformat(),
+        }
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _Entry:
+    def __init__(self, name: str, path: Path, loader: Callable[[Path], Any]):
+        self.name = name
+        self.path = path
+        self.loader = loader
+        self.current: Optional[LoadedModel] = None
+        self.last_checked = 0.0
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """Loads models once per process and hot-swaps them when their files change"""
+
+    def __init__(self, check_interval_seconds: float = MODEL_CHECK_INTERVAL_SECONDS):
+        self.check_interval_seconds = check_interval_seconds
+        self._entries: Dict[str, _Entry] = {}
+
+    def register(self, name: str, path: Path, loader: Callable[[Path], Any]) -> None:
+        """Register a model file; it is loaded on first get()"""
+        existing = self._entries.get(name)
+        if existing and existing.path == Path(path):
+            return
+        self._entries[name] = _Entry(name, Path(path), loader)
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._entries
+
+    def get(self, name: str) -> LoadedModel:
+        """
+        Current version of a model, reloading it if the file changed.
+        Raises FileNotFoundError if the model was never loadable.
+        """
+        entry = self._entries[name]
+        current = entry.current
+        if current is not None and time.monotonic() - entry.last_checked < self.check_interval_seconds:
+            return current
+
+        with entry.lock:
+            if entry.current is None or time.monotonic() - entry.last_checked >= self.check_interval_seconds:
+                self._refresh(entry)
+            return entry.current
+
+    def load_all(self) -> List[LoadedModel]:
+        """Load (or refresh) every registered model that exists on disk"""
+        loaded = []
+        for name, entry in self._entries.items():
+            if entry.path.exists():
+                loaded.append(self.get(name))
+            else:
+                logger.warning(f"Model '{name}' not found at {entry.path}")
+        return loaded
+
+    def info(self) -> List[Dict[str, Any]]:
+        """Loaded version and load time of every registered model"""
+        result = []
+        for name, entry in self._entries.items():
+            if entry.current is not None:
+                result.append(entry.current.info())
+            else:
+                result.append({"name": name, "path": str(entry.path), "version": None, "loaded_at": None})
+        return result
+
+    def _refresh(self, entry: _Entry) -> None:
+        entry.last_checked = time.monotonic()
+        current = entry.current
+        try:
+            stat = entry.path.stat()
+        except FileNotFoundError:
+            if current is None:
+                raise FileNotFoundError(
+                    f"Model not found at {entry.path}. Train model with the ml-training service first."
+                )
+            logger.warning(f"Model file {entry.path} disappeared; keeping version {current.version}")
+            return
+
+        if current is not None and (stat.st_mtime, stat.st_size) == (current.file_mtime, current.file_size):
+            return
+
+        version = file_sha256(entry.path)[:16]
+        if current is not None and version == current.version:
+            # Touched but unchanged: remember the new mtime so we don't hash it again
+            entry.current = LoadedModel(
+                current.name, current.path, current.model, current.version,
+                stat.st_mtime, stat.st_size, current.loaded_at
+            )
+            return
+
+        try:
+            model = entry.loader(entry.path)
+        except Exception as e:
+            if current is None:
+                raise
+            # e.g. a half-written file during deploy: keep serving the old version
+            logger.error(f"Failed to reload model '{entry.name}' from {entry.path}: {e}")
+            return
+
+        entry.current = LoadedModel(
+            name=entry.name,
+            path=entry.path,
+            model=model,
+            version=version,
+            file_mtime=stat.st_mtime,
+            file_size=stat.st_size,
+            loaded_at=datetime.utcnow(),
+        )
+        if current is None:
+            logger.info(f"Loaded model '{entry.name}' version {version} from {entry.path}")
+        else:
+            logger.info(f"Reloaded model '{entry.name}': {current.version} -> {version}")
+
+
+model_registry = ModelRegistry()
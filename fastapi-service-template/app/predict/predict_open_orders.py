@@ -1,12 +1,17 @@
 """
 Predict open orders using trained CatBoost model and save predictions to the database.
-This script calculates expected_lead_time (95% confidence upper bound) and recommended booking dates.
+This script calculates expected_lead_time (p97.5 from the quantile models) and recommended booking dates.
 Run this script inside the backend container (backend must have access to /models/catboost_model.json)
 """
 import os
 import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import timedelta
+from typing import Callable, List, Optional
 
 try:
     import pandas as pd
@@ -16,195 +21,314 @@ except Exception as e:
     raise RuntimeError("Required ML packages are not installed in this environment: pandas, numpy, catboost") from e
 
 from models import SessionLocal
-from models.customer_order import CustomerOrder
-from models.destination_track import DestinationTrack
+from predict.features import CAT_FEATURE_INDICES, ORDER_SOURCE_COLUMNS, build_features, source_frame_from_rows
+from predict.model_registry import LoadedModel, model_registry
+from predict.prediction_cache import prediction_cache
+from predict.route_features import refresh_route_feature_store
+from repositories.customer_order_repository import CustomerOrderRepository
 from repositories.prediction_repository import OrderPredictionRepository
-from repositories.vehicle_type_repository import VehicleTypeRepository
-from utils.emissions import calculate_co2_emissions
+from services.route_resolver import refresh_route_resolver
+from services.vehicle_capacity_index import VehicleCapacityIndex
+from services.calculate_emissions import calculate_co2_batch
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 MODEL_PATH = Path("/models/catboost_model.json")
+# Quantile models trained alongside the duration model (ml-training/train_model.py)
+Q025_MODEL_PATH = MODEL_PATH.parent / "duration_with_leadtime_q025.json"
+Q975_MODEL_PATH = MODEL_PATH.parent / "duration_with_leadtime_q975.json"
 
-# Features that were used in training (best-effort matching)
-CAT_FEATURES = [
-    'origin_country', 'origin_city', 'destination_country', 'destination_city',
-    'ship_dow', 'vessel', 'flight_voyage', 'weight_uq', 'volume_uq'
-]
-NUM_FEATURES = [
-    'ship_year', 'ship_month', 'ship_week',
-    'distance_km', 'leadtime_expected_days', 'average_distance_per_day',
-    'weight', 'volume',
-    'origin_temp_mean', 'origin_temp_max', 'origin_temp_min', 'origin_precip_mm',
-    'dest_temp_mean', 'dest_temp_max', 'dest_temp_min', 'dest_precip_mm'
-]
-FEATURE_COLS = CAT_FEATURES + NUM_FEATURES
+# Emissions formula used for predicted_co2_kg ("utils" or "config", see services.calculate_emissions)
+EMISSIONS_MODE = os.getenv("EMISSIONS_MODE", "utils")
+DEFAULT_TEMP_C = 25.0  # used when a route has no average destination temperature
+DEFAULT_EMISSION_FACTOR_KG_PER_KM = 0.5  # used when a vehicle has no emission factor
 
+# Open orders read, scored and written per chunk during a run
+PREDICTION_CHUNK_SIZE = int(os.getenv("PREDICTION_CHUNK_SIZE", "5000"))
+# Scoring processes per run; 1 scores in-process
+PREDICTION_WORKERS = int(os.getenv("PREDICTION_WORKERS", "1"))
 
 def load_model(path: Path):
     if not path.exists():
         raise FileNotFoundError(f"Model not found at {path}. Train model with the ml-training service first.")
     model = CatBoostRegressor()
     model.load_model(str(path), format='json')
+    # CatBoost accepts truncated/invalid JSON as an empty model; treat that as a failed load
+    if not model.tree_count_:
+        raise ValueError(f"Model at {path} has no trees (incomplete or invalid model file)")
     return model
 
 
-def build_row_from_order(order: CustomerOrder):
-    """Construct a dict of features for a given order. If some features aren't available, leave as NaN/None."""
-    row = {}
-    # Map available fields - updated to match new model field names
-    row['origin_country'] = getattr(order, 'origin_country', None)
-    row['origin_city'] = getattr(order, 'origin_state', None)  # Using origin_state as city proxy
-    row['destination_country'] = getattr(order, 'destination_country', None)
-    row['destination_city'] = getattr(order, 'destination_state', None)  # Using destination_state as city proxy
-    
-    # ship_dow from load_date if present
-    try:
-        if order.load_date:
-            row['ship_dow'] = order.load_date.weekday()
-            row['ship_year'] = order.load_date.year
-            row['ship_month'] = order.load_date.month
-            row['ship_week'] = order.load_date.isocalendar()[1]
-        else:
-            row['ship_dow'] = None
-            row['ship_year'] = None
-            row['ship_month'] = None
-            row['ship_week'] = None
-    except Exception:
-        row['ship_dow'] = None
-        row['ship_year'] = None
-        row['ship_month'] = None
-        row['ship_week'] = None
-
-    # Other numeric-like fields - updated field names
-    row['leadtime_expected_days'] = getattr(order, 'lead_time_days', None)
-    row['weight'] = getattr(order, 'gross_weight_kg', None)  # Using gross_weight_kg instead of weight_kg
-    row['volume'] = None  # volume_m3 not available in new schema
-
-    # placeholders for features not available on order
-    for c in FEATURE_COLS:
-        if c not in row:
-            row[c] = None
-
-    return row
-
-
-def recommend_vehicle_type(db, weight, volume):
-    """Very basic recommendation: choose smallest vehicle type that can fit the weight and volume."""
-    vrepo = VehicleTypeRepository(db)
-    candidates = vrepo.get_all()
-    # Filter out types with no capacity info (keep them but deprioritize)
-    fit = []
-    for v in candidates:
-        fits_weight = (v.max_weight_kg is None) or (weight is None) or (v.max_weight_kg >= weight)
-        fits_volume = (v.max_volume_m3 is None) or (volume is None) or (v.max_volume_m3 >= volume)
-        if fits_weight and fits_volume:
-            fit.append(v)
-    if not fit:
-        return None
-    # choose the one with smallest capacity that still fits (by weight then volume)
-    fit_sorted = sorted(fit, key=lambda x: ((x.max_weight_kg or 1e12), (x.max_volume_m3 or 1e12)))
-    return fit_sorted[0]
-
-
-def predict_open_orders():
-    logger.info("Starting prediction run for open orders")
-
-    model = load_model(MODEL_PATH)
+LEAD_TIME_MODEL = "lead_time"
+LEAD_TIME_P025_MODEL = "lead_time_p025"
+LEAD_TIME_P975_MODEL = "lead_time_p975"
+model_registry.register(LEAD_TIME_MODEL, MODEL_PATH, load_model)
+model_registry.register(LEAD_TIME_P025_MODEL, Q025_MODEL_PATH, load_model)
+model_registry.register(LEAD_TIME_P975_MODEL, Q975_MODEL_PATH, load_model)
+
+
+@dataclass(frozen=True)
+class LeadTimeModels:
+    """
+    The point and quantile lead time models taken from the registry together, so a hot
+    reload mid-batch cannot score with one version and label the results with another
+    """
+    point: LoadedModel
+    p025: Optional[LoadedModel] = None
+    p975: Optional[LoadedModel] = None
+
+    @property
+    def version(self) -> str:
+        """Version tag stored on predictions: the point model version, plus the quantile models' if available"""
+        return "+".join(m.version for m in (self.point, self.p025, self.p975) if m is not None)
+
+
+def lead_time_models() -> LeadTimeModels:
+    """Current registry entries of the lead time models (quantile models are optional)"""
+    quantiles = []
+    for name in (LEAD_TIME_P025_MODEL, LEAD_TIME_P975_MODEL):
+        try:
+            quantiles.append(model_registry.get(name))
+        except FileNotFoundError:
+            quantiles.append(None)
+    return LeadTimeModels(model_registry.get(LEAD_TIME_MODEL), *quantiles)
+
+
+def predict_lead_times(pool: Pool, models: Optional[LeadTimeModels] = None):
+    """
+    Score the point model and both quantile models over the same Pool in one pass.
+    Returns (point, p2.5, p97.5, confidence) arrays. Without the quantile models
+    the upper bound falls back to point + 1.645 * 20% and confidence is NaN.
+    """
+    if models is None:
+        models = lead_time_models()
+    point = models.point.model.predict(pool)
+
+    if models.p025 is None or models.p975 is None:
+        logger.warning("Quantile models not found; using a 20% coefficient of variation for the upper bound")
+        nan = np.full(len(point), np.nan)
+        return point, nan, point + 1.645 * (point * 0.20), nan
+
+    # Quantile regressors are fit independently and can cross; order them per row
+    raw_lower = models.p025.model.predict(pool)
+    raw_upper = models.p975.model.predict(pool)
+    lower = np.minimum(raw_lower, raw_upper)
+    upper = np.maximum(raw_lower, raw_upper)
+
+    # Narrow 95% interval relative to the upper bound -> confidence near 1
+    width = upper - lower
+    confidence = np.clip(1.0 - width / np.maximum(np.abs(upper), 1.0), 0.0, 1.0)
+    return point, lower, upper, confidence
+
+
+def predict_co2_for_orders(weights, vehicle_positions, capacity_index, destination_tracks):
+    """
+    CO2 for a whole batch of orders in one vectorized call.
+    Orders without a recommended vehicle, a known route or a weight get NaN, and so do
+    orders with an invalid weight or route distance (negative or infinite), which are
+    counted in a warning instead of failing the whole batch.
+    """
+    weights = np.asarray(weights, dtype=float)
+    vehicle_positions = np.asarray(vehicle_positions)
+    has_vehicle = vehicle_positions >= 0
+    has_track = np.array([t is not None for t in destination_tracks], dtype=bool)
+    has_weight = np.nan_to_num(weights, nan=0.0) != 0
+
+    distances = np.array(
+        [t.distance_km if t is not None and t.distance_km is not None else 0.0 for t in destination_tracks],
+        dtype=float
+    )
+    invalid = (weights < 0) | np.isinf(weights) | (distances < 0) | np.isinf(distances)
+    if invalid.any():
+        logger.warning(f"{int(invalid.sum())} order(s) with a negative or invalid weight/distance get no CO2 prediction")
+        weights = np.where(invalid, 0.0, weights)
+        distances = np.where(invalid, 0.0, distances)
+    temps = np.array(
+        [t.dest_temp_mean if t is not None and t.dest_temp_mean is not None else DEFAULT_TEMP_C for t in destination_tracks],
+        dtype=float
+    )
+    factors = np.full(len(vehicle_positions), DEFAULT_EMISSION_FACTOR_KG_PER_KM)
+    if len(capacity_index):
+        vehicle_factors = capacity_index.emission_factors[np.where(has_vehicle, vehicle_positions, 0)]
+        factors = np.where(has_vehicle & ~np.isnan(vehicle_factors), vehicle_factors, factors)
+
+    co2 = calculate_co2_batch(distances, np.nan_to_num(weights, nan=0.0), temps, factors, mode=EMISSIONS_MODE)
+    return np.where(has_vehicle & has_track & has_weight & ~invalid, co2, np.nan)
+
+
+def score_orders(source: pd.DataFrame, models: LeadTimeModels, capacity_index, route_resolver, route_features=None):
+    """
+    Score one batch of orders: lead times, vehicle, route and CO2.
+    source is an order source frame (predict.features.source_frame_from_rows/_from_objects);
+    models (from lead_time_models()) score the batch and label it with their version;
+    route_features is the RouteFeatureStore for distance/weather features.
+    Returns prediction dicts ready for OrderPredictionRepository.create_many().
+    """
+    features = build_features(source, route_features)
+    model_version = models.version
+
+    # Point and p2.5/p97.5 predictions from one shared Pool; the p97.5 is the expected lead time.
+    # Feature rows already scored by this model version come from the prediction cache.
+    preds, lower_bounds, expected_lead_times, confidences = prediction_cache.score(
+        features,
+        model_version,
+        lambda rows: predict_lead_times(Pool(rows, cat_features=CAT_FEATURE_INDICES), models)
+    )
+
+    # Recommend the smallest fitting vehicle for every order in one vectorized lookup
+    weights = pd.to_numeric(source["gross_weight_kg"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    vehicle_positions = capacity_index.smallest_fit_many(weights)
+
+    # Resolve every order's route from the preloaded map
+    destination_tracks = route_resolver.resolve_many(source["origin_state"], source["destination_state"])
+
+    predicted_co2 = predict_co2_for_orders(weights, vehicle_positions, capacity_index, destination_tracks)
+
+    predictions = []
+    for order_id, arrival_date, lead_time, confidence, vehicle_pos, destination_track, co2 in zip(
+        source["id"], source["requested_delivery_date"], expected_lead_times, confidences,
+        vehicle_positions, destination_tracks, predicted_co2
+    ):
+        predictions.append({
+            "order_id": None if pd.isna(order_id) else int(order_id),
+            "expected_lead_time": float(lead_time),
+            "predicted_co2": None if np.isnan(co2) else float(co2),
+            "recommended_vehicle_type_id": int(capacity_index.ids[vehicle_pos]) if vehicle_pos >= 0 else None,
+            "destination_track_id": destination_track.id if destination_track else None,
+            "confidence": None if np.isnan(confidence) else float(confidence),
+            "requested_arrival_date": None if pd.isna(arrival_date) else arrival_date,
+            "model_version": model_version
+        })
+    return predictions
+
+
+# Per-process state of a scoring worker, set once by _init_worker()
+_worker_state = {}
+
+
+def _init_worker(capacity_index, route_resolver, route_features, model_version: str) -> None:
+    """Process pool initializer: load the models once and keep the run's fleet, routes and route features"""
+    models = lead_time_models()
+    if models.version != model_version:
+        # The model file changed between the parent's load and this worker's
+        raise RuntimeError(f"Worker loaded model version {models.version}, run expects {model_version}")
+    _worker_state.update(
+        models=models,
+        capacity_index=capacity_index,
+        route_resolver=route_resolver,
+        route_features=route_features,
+    )
+
+
+def _score_shard(rows: List[tuple]) -> List[dict]:
+    """Score one id-range shard of order source rows in a worker process"""
+    return score_orders(
+        source_frame_from_rows(rows),
+        _worker_state["models"],
+        _worker_state["capacity_index"],
+        _worker_state["route_resolver"],
+        _worker_state["route_features"]
+    )
+
+
+def _score_in_process(shards, models, capacity_index, route_resolver, route_features):
+    for rows in shards:
+        yield score_orders(source_frame_from_rows(rows), models, capacity_index, route_resolver, route_features)
+
+
+def _score_in_pool(shards, workers: int, capacity_index, route_resolver, route_features, model_version):
+    """
+    Score shards on a pool of worker processes, yielding results in shard order.
+    At most 2 * workers shards are in flight, so memory stays bounded.
+    """
+    # spawn: workers don't inherit the parent's DB connections or threads
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(capacity_index, route_resolver, route_features, model_version)
+    ) as pool:
+        pending = deque()
+        for rows in shards:
+            pending.append(pool.submit(_score_shard, [tuple(r) for r in rows]))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def predict_open_orders(
+    full: bool = False,
+    progress: Optional[Callable[[int, int], None]] = None,
+    chunk_size: int = PREDICTION_CHUNK_SIZE,
+    workers: int = PREDICTION_WORKERS
+) -> int:
+    """
+    Score open orders and save their predictions. Returns the number of orders scored.
+    By default the run is incremental: only orders changed since their latest prediction,
+    or last predicted by another model version, are scored. full=True re-scores every open order.
+    Orders are streamed in keyset-paged chunks of chunk_size: each chunk is scored, written
+    and dropped before the next is read, so memory stays flat regardless of backlog size.
+    With workers > 1 each chunk (an id-range shard) is scored on a process pool and the
+    results are bulk inserted here, in the parent.
+    progress(scored, total) is called after every chunk.
+    """
+    logger.info(f"Starting {'full' if full else 'incremental'} prediction run for open orders")
+
+    # Resident models from the process-wide registry (reloaded only when the file changes)
+    models = lead_time_models()
+    model_version = models.version
+    logger.info(f"Using model version {model_version}")
 
     db = SessionLocal()
+    order_repo = CustomerOrderRepository(db)
     pred_repo = OrderPredictionRepository(db)
 
     try:
-        # Consider orders with status pending/confirmed/in_transit as "open"
-        open_statuses = ['pending', 'confirmed', 'in_transit']
-        orders = db.query(CustomerOrder).filter(CustomerOrder.status.in_(open_statuses)).all()
-
-        if not orders:
-            logger.info("No open orders found")
-            return
-
-        rows = []
-        order_map = []
-        for o in orders:
-            row = build_row_from_order(o)
-            rows.append(row)
-            order_map.append(o)
-
-        df = pd.DataFrame(rows)
-
-        # Ensure the order of columns matches model expectations (best-effort)
-        model_cols = [c for c in FEATURE_COLS if c in df.columns]
-        if not model_cols:
-            logger.warning("No matching features found between orders and model features. Predictions may be meaningless.")
-            model_cols = df.columns.tolist()
-
-        df_for_pred = df[model_cols].copy()
-        
-        # Fill missing values: convert None to empty string for categorical, 0 for numeric
-        for col in df_for_pred.columns:
-            if col in CAT_FEATURES:
-                df_for_pred[col] = df_for_pred[col].fillna("")
-            else:
-                df_for_pred[col] = df_for_pred[col].fillna(0)
-
-        cat_cols = [c for c in CAT_FEATURES if c in df_for_pred.columns]
-        cat_indices = [df_for_pred.columns.get_loc(c) for c in cat_cols]
-
-        pool = Pool(df_for_pred, cat_features=cat_indices) if cat_indices else Pool(df_for_pred)
-        
-        # Get base predictions (mean prediction)
-        preds = model.predict(pool)
-        
-        # Calculate 95% confidence upper bound for expected lead time
-        # For CatBoost, we can use virtual_ensembles to estimate uncertainty
-        # Alternatively, add a margin based on historical variance (simplified approach)
-        # Here we'll use a simplified approach: expected_lead_time = predicted_transit_days + 1.645 * std_estimate
-        # Assuming ~20% coefficient of variation as a rough estimate
-        std_estimates = preds * 0.20  # 20% of prediction as standard deviation
-        expected_lead_times = preds + 1.645 * std_estimates  # 95% one-sided confidence interval
-
-        for o, pred_transit, lead_time in zip(order_map, preds, expected_lead_times):
-            # basic confidence placeholder: not available from plain CatBoost JSON predict
-            confidence = None
-            
-            # recommend vehicle type - using gross_weight_kg
-            rec_vehicle = recommend_vehicle_type(db, getattr(o, 'gross_weight_kg', None), None)
-            rec_vehicle_id = rec_vehicle.id if rec_vehicle else None
-            
-            # Find matching destination track (if available)
-            destination_track = db.query(DestinationTrack).filter(
-                DestinationTrack.origin_city == o.origin_state,
-                DestinationTrack.destination_city == o.destination_state
-            ).first()
-            destination_track_id = destination_track.id if destination_track else None
-            
-            # Calculate CO2 emissions if we have vehicle, track, and weight
-            predicted_co2 = None
-            if rec_vehicle and destination_track and o.gross_weight_kg:
-                temp = destination_track.dest_temp_mean or 25  # Default to 25°C if not available
-                predicted_co2 = calculate_co2_emissions(
-                    distance_km=destination_track.distance_km or 0,
-                    weight_kg=o.gross_weight_kg,
-                    temp_c=temp,
-                    emission_factor_kg_per_km=rec_vehicle.emission_factor_kg_per_km or 0.5
-                )
-            
-            pred_repo.create(
-                order_id=o.id,
-                expected_lead_time=float(lead_time),
-                predicted_co2=predicted_co2,
-                recommended_vehicle_type_id=rec_vehicle_id,
-                destination_track_id=destination_track_id,
-                confidence=confidence,
-                requested_arrival_date=o.requested_delivery_date
-            )
-
-        logger.info(f"Saved predictions for {len(order_map)} orders")
+        # Orders with status pending/confirmed/in_transit are "open"
+        version_filter = None if full else model_version
+        total = order_repo.count_open_for_prediction(version_filter)
+
+        if progress:
+            progress(0, total)
+
+        if not total:
+            logger.info("No open orders need prediction")
+            return 0
+
+        # Fleet, routes and route features are loaded once per run and shared by every chunk
+        capacity_index = VehicleCapacityIndex.from_db(db)
+        route_resolver = refresh_route_resolver(db)
+        route_features = refresh_route_feature_store(db)
+
+        shards = order_repo.iter_open_for_prediction(ORDER_SOURCE_COLUMNS, version_filter, chunk_size)
+        if workers > 1 and total > chunk_size:
+            workers = min(workers, -(-total // chunk_size))
+            logger.info(f"Scoring on {workers} worker processes")
+            results = _score_in_pool(shards, workers, capacity_index, route_resolver, route_features, model_version)
+        else:
+            results = _score_in_process(shards, models, capacity_index, route_resolver, route_features)
+
+        scored = 0
+        for predictions in results:
+            scored += pred_repo.create_many(predictions)
+            logger.info(f"Scored {scored}/{total} open orders")
+            if progress:
+                progress(scored, total)
+
+        logger.info(f"Saved predictions for {scored} orders")
+        return scored
 
     finally:
         db.close()
 
 if __name__ == '__main__':
-    predict_open_orders()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Predict open orders")
+    parser.add_argument("--full", action="store_true", help="Re-score every open order, not only changed ones")
+    parser.add_argument("--chunk-size", type=int, default=PREDICTION_CHUNK_SIZE, help="Orders scored per chunk")
+    parser.add_argument("--workers", type=int, default=PREDICTION_WORKERS, help="Scoring processes (1 = in-process)")
+    args = parser.parse_args()
+    predict_open_orders(full=args.full, chunk_size=args.chunk_size, workers=args.workers)
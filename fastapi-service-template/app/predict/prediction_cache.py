@@ -0,0 +1,173 @@
+"""
+Prediction result cache keyed on the feature row.
+
+Many open orders share an identical feature vector (same route, weight, load
+week). Model output is cached per (model version, 64-bit hash of the typed
+feature row) in an in-process LRU bounded by PREDICTION_CACHE_SIZE entries;
+with PREDICTION_CACHE_DB enabled, misses fall through to the shared
+prediction_cache table so every worker and process benefits from each other's
+scoring. Duplicate rows within one batch are scored once. Only model output
+is cached - vehicle, route and CO2 are recomputed per order.
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from models import SessionLocal
+from repositories.prediction_cache_repository import PredictionCacheRepository
+
+logger = logging.getLogger(__name__)
+
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "100000"))
+PREDICTION_CACHE_DB = os.getenv("PREDICTION_CACHE_DB", "false").lower() in ("1", "true", "yes")
+
+# (point, p2.5, p97.5, confidence) for one feature row
+CachedOutput = Tuple[float, float, float, float]
+# Scores a feature frame -> (point, p2.5, p97.5, confidence) arrays
+ScoreFn = Callable[[pd.DataFrame], Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]
+
+
+def feature_hashes(features: pd.DataFrame) -> np.ndarray:
+    """Stable 64-bit hash per feature row (same values -> same hash, in any process), as int64"""
+    return pd.util.hash_pandas_object(features, index=False).to_numpy().view(np.int64)
+
+
+class PredictionCache:
+    """LRU of model output per (model version, feature hash) with an optional database tier"""
+
+    def __init__(self, max_size: int = PREDICTION_CACHE_SIZE, use_db: bool = PREDICTION_CACHE_DB):
+        self.max_size = max_size
+        self.use_db = use_db
+        self._entries: "OrderedDict[Tuple[str, int], CachedOutput]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def lookup(self, model_version: str, feature_hash: int) -> Optional[CachedOutput]:
+        with self._lock:
+            key = (model_version, feature_hash)
+            output = self._entries.get(key)
+            if output is not None:
+                self._entries.move_to_end(key)
+            return output
+
+    def store(self, model_version: str, outputs: Dict[int, CachedOutput]) -> None:
+        with self._lock:
+            for feature_hash, output in outputs.items():
+                self._entries[(model_version, feature_hash)] = output
+                self._entries.move_to_end((model_version, feature_hash))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def score(self, features: pd.DataFrame, model_version: str, score_fn: ScoreFn):
+        """
+        (point, p2.5, p97.5, confidence) arrays for a feature frame, calling score_fn
+        only for the distinct rows that are in neither cache tier.
+        """
+        if not self.enabled or features.empty:
+            return score_fn(features)
+
+        hashes = feature_hashes(features)
+        unique_hashes, first_rows, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+
+        outputs: Dict[int, CachedOutput] = {}
+        for h in unique_hashes.tolist():
+            output = self.lookup(model_version, h)
+            if output is not None:
+                outputs[h] = output
+        memory_hits = len(outputs)
+
+        missing = [h for h in unique_hashes.tolist() if h not in outputs]
+        db_outputs = self._load_from_db(model_version, missing) if self.use_db and missing else {}
+        outputs.update(db_outputs)
+
+        scored: Dict[int, CachedOutput] = {}
+        missing_positions = [i for i, h in enumerate(unique_hashes.tolist()) if h not in outputs]
+        if missing_positions:
+            rows = features.iloc[first_rows[missing_positions]].reset_index(drop=True)
+            point, lower, upper, confidence = score_fn(rows)
+            for j, i in enumerate(missing_positions):
+                scored[int(unique_hashes[i])] = (
+                    float(point[j]), float(lower[j]), float(upper[j]), float(confidence[j])
+                )
+            outputs.update(scored)
+            if self.use_db:
+                self._save_to_db(model_version, scored)
+
+        self.store(model_version, {**db_outputs, **scored})
+        with self._lock:
+            # Counted per order: rows sharing a feature vector with a scored row are hits too
+            self.misses += len(scored)
+            self.db_hits += len(db_outputs)
+            self.hits += len(hashes) - len(scored)
+
+        logger.debug(
+            f"Prediction cache: {len(hashes)} rows, {len(unique_hashes)} distinct, "
+            f"{memory_hits} memory hits, {len(db_outputs)} db hits, {len(scored)} scored"
+        )
+        table = np.array([outputs[h] for h in unique_hashes.tolist()], dtype=float).reshape(-1, 4)[inverse]
+        return table[:, 0], table[:, 1], table[:, 2], table[:, 3]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "db_tier": self.use_db,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
+
+    def clear(self) -> None:
+        """Drop the in-process entries and reset the counters (the database tier is kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.db_hits = self.misses = 0
+
+    def _load_from_db(self, model_version: str, hashes) -> Dict[int, CachedOutput]:
+        db = SessionLocal()
+        try:
+            found = PredictionCacheRepository(db).get_many(model_version, hashes)
+            return {h: tuple(np.nan if v is None else v for v in output) for h, output in found.items()}
+        except Exception as e:
+            # The shared tier is an optimization; score instead of failing the batch
+            logger.warning(f"Prediction cache lookup failed: {e}")
+            return {}
+        finally:
+            db.close()
+
+    def _save_to_db(self, model_version: str, outputs: Dict[int, CachedOutput]) -> None:
+        entries = [
+            {
+                "feature_hash": feature_hash,
+                "lead_time": point,
+                "lead_time_lower": None if np.isnan(lower) else lower,
+                "lead_time_upper": upper,
+                "confidence": None if np.isnan(confidence) else confidence,
+            }
+            for feature_hash, (point, lower, upper, confidence) in outputs.items()
+        ]
+        db = SessionLocal()
+        try:
+            PredictionCacheRepository(db).put_many(model_version, entries)
+        except Exception as e:
+            logger.warning(f"Prediction cache write failed: {e}")
+        finally:
+            db.close()
+
+
+prediction_cache = PredictionCache()
@@ -0,0 +1,120 @@
+"""
+Route feature store for serving-time features.
+
+Training rows carry distance and origin/destination weather per shipment; at
+serving time an order only has its route and load date. The route_week_features
+table holds the historical means per (route, ISO week) plus a route-level row
+(iso_week = 0), built once by init_db from the shipment CSVs. RouteFeatureStore
+keeps it in memory and joins it onto a batch with two vectorized merges:
+route + week first, then the route-level means where the week has no history.
+"""
+import logging
+import threading
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from models.route_week_feature import RouteWeekFeature
+from repositories.route_week_feature_repository import RouteWeekFeatureRepository
+
+logger = logging.getLogger(__name__)
+
+ROUTE_FEATURES = [
+    'distance_km', 'average_distance_per_day',
+    'origin_temp_mean', 'origin_temp_max', 'origin_temp_min', 'origin_precip_mm',
+    'dest_temp_mean', 'dest_temp_max', 'dest_temp_min', 'dest_precip_mm'
+]
+ALL_WEEKS = 0
+_KEY = ['origin_city', 'destination_city']
+
+
+def normalize_locations(values) -> pd.Series:
+    """Vectorized services.route_resolver.normalize_location: trimmed, upper case, None if blank"""
+    series = pd.Series(values, dtype=object)
+    normalized = series.where(series.isna(), series.astype(str).str.strip().str.upper())
+    return normalized.where(normalized.notna() & (normalized != ""), None)
+
+
+def aggregate_route_week_features(shipments: pd.DataFrame) -> pd.DataFrame:
+    """
+    Feature store rows from historical shipments (the *_with_weather_clean.csv columns):
+    means per (route, ISO week of actual_ship) and per route with iso_week = ALL_WEEKS.
+    """
+    df = shipments.copy()
+    df['origin_city'] = normalize_locations(df['origin_city'])
+    df['destination_city'] = normalize_locations(df['destination_city'])
+    df = df.dropna(subset=_KEY)
+
+    ship_dates = pd.to_datetime(df['actual_ship'], errors='coerce')
+    df['iso_week'] = ship_dates.dt.isocalendar().week.astype(float)
+    df['iso_week'] = df['iso_week'].fillna(pd.to_numeric(df.get('ship_week'), errors='coerce'))
+
+    aggregations = {col: 'mean' for col in ROUTE_FEATURES}
+    aggregations['shipment_id'] = 'count'
+    weekly = df.dropna(subset=['iso_week']).groupby(_KEY + ['iso_week']).agg(aggregations).reset_index()
+    route_level = df.groupby(_KEY).agg(aggregations).reset_index()
+    route_level['iso_week'] = ALL_WEEKS
+
+    table = pd.concat([weekly, route_level], ignore_index=True).rename(columns={'shipment_id': 'shipments'})
+    table['iso_week'] = table['iso_week'].astype(int)
+    return table[_KEY + ['iso_week', 'shipments'] + ROUTE_FEATURES]
+
+
+class RouteFeatureStore:
+    """In-memory route/week feature table with a vectorized batch lookup"""
+
+    def __init__(self, table: pd.DataFrame):
+        table = table[_KEY + ['iso_week'] + ROUTE_FEATURES]
+        # float week keys so they merge with NaN-able batch weeks
+        self.weekly = table[table['iso_week'] != ALL_WEEKS].astype({'iso_week': float}).reset_index(drop=True)
+        self.route_level = table[table['iso_week'] == ALL_WEEKS].drop(columns='iso_week').reset_index(drop=True)
+
+    @classmethod
+    def from_db(cls, db: Session) -> "RouteFeatureStore":
+        """Load the whole feature store in one query"""
+        columns = [getattr(RouteWeekFeature, c) for c in _KEY + ['iso_week'] + ROUTE_FEATURES]
+        rows = RouteWeekFeatureRepository(db).get_all_rows(columns)
+        table = pd.DataFrame(rows, columns=_KEY + ['iso_week'] + ROUTE_FEATURES)
+        table[ROUTE_FEATURES] = table[ROUTE_FEATURES].astype(float)
+        store = cls(table)
+        logger.info(f"Loaded route feature store: {len(store.route_level)} routes, {len(store.weekly)} route weeks")
+        return store
+
+    def __len__(self) -> int:
+        return len(self.route_level)
+
+    def lookup(self, origins, destinations, weeks) -> pd.DataFrame:
+        """
+        ROUTE_FEATURES for each (origin, destination, ISO week), in input order.
+        Unknown weeks (or NaN week) fall back to the route-level means; unknown routes are NaN.
+        """
+        keys = pd.DataFrame({
+            'origin_city': normalize_locations(origins).to_numpy(),
+            'destination_city': normalize_locations(destinations).to_numpy(),
+            'iso_week': pd.to_numeric(pd.Series(weeks, dtype=object), errors='coerce').to_numpy(dtype=float),
+        })
+        by_week = keys.merge(self.weekly, how='left', on=_KEY + ['iso_week'])
+        by_route = keys[_KEY].merge(self.route_level, how='left', on=_KEY)
+        return by_week[ROUTE_FEATURES].fillna(by_route[ROUTE_FEATURES]).reset_index(drop=True)
+
+
+_store: Optional[RouteFeatureStore] = None
+_store_lock = threading.Lock()
+
+
+def get_route_feature_store(db: Session) -> RouteFeatureStore:
+    """Process-wide route feature store, loaded on first use"""
+    store = _store
+    if store is None:
+        store = refresh_route_feature_store(db)
+    return store
+
+
+def refresh_route_feature_store(db: Session) -> RouteFeatureStore:
+    """Reload the feature store table and swap in a new process-wide store"""
+    global _store
+    store = RouteFeatureStore.from_db(db)
+    with _store_lock:
+        _store = store
+    return store
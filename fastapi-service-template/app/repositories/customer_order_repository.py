@@ -1,11 +1,114 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import (
+    Column, Integer, MetaData, Row, Select, Table, column, func, insert, literal_column, or_, select, tuple_, update, values
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import io
 import logging
-from models.customer_order import CustomerOrder
-from schemas.customer_order import CustomerOrderCreate, CustomerOrderUpdate
+from models.customer_order import LATEST_PREDICTION_COLUMNS, OPEN_STATUSES, CustomerOrder
+from models.order_prediction import OrderPrediction
+from models.vehicle_type import VehicleType
+from schemas.customer_order import CustomerOrderCreate, CustomerOrderResponse, CustomerOrderUpdate
+from schemas.order_prediction import OrderPredictionResponse
+from schemas.vehicle_type import VehicleTypeResponse
 
 logger = logging.getLogger(__name__)
 
+# Keyset position of a listing page: (created_at, id) of its last order
+OrderCursor = Tuple[datetime, int]
+
+# Order numbers / ids per IN (...) lookup, below SQLite's bound parameter limit
+LOOKUP_CHUNK_SIZE = 900
+
+# Orders assigned per UPDATE ... FROM (VALUES ...) (or per id lookup elsewhere) by confirm_many
+CONFIRM_CHUNK_SIZE = 900
+
+# Columns of the lean listing path, taken from the response schemas so both paths emit the same JSON
+_NESTED_FIELDS = ("vehicle_type", "last_prediction")
+ORDER_LISTING_COLUMNS = [
+    getattr(CustomerOrder, f) for f in CustomerOrderResponse.model_fields if f not in _NESTED_FIELDS
+]
+VEHICLE_LISTING_COLUMNS = [getattr(VehicleType, f) for f in VehicleTypeResponse.model_fields]
+PREDICTION_LISTING_COLUMNS = [
+    getattr(CustomerOrder, LATEST_PREDICTION_COLUMNS[f]) for f in OrderPredictionResponse.model_fields if f != "order_id"
+]
+
+
+def order_page_select(*criteria, skip: int = 0, limit: int = 100, after: Optional[OrderCursor] = None) -> Select:
+    """
+    One listing page of orders matching criteria, ordered by (created_at, id).
+    With after (a cursor), keyset paging: WHERE (created_at, id) > after; skip is ignored.
+    """
+    return _paged(select(CustomerOrder).where(*criteria), skip, limit, after)
+
+
+def _paged(stmt: Select, skip: int, limit: int, after: Optional[OrderCursor]) -> Select:
+    if after is not None:
+        stmt = stmt.where(tuple_(CustomerOrder.created_at, CustomerOrder.id) > tuple(after))
+        skip = 0
+    return stmt.order_by(CustomerOrder.created_at, CustomerOrder.id).offset(skip).limit(limit)
+
+
+def order_listing_select(*criteria, skip: int = 0, limit: int = 100, after: Optional[OrderCursor] = None) -> Select:
+    """
+    order_page_select() as plain columns: the order's listing columns, its latest prediction
+    columns and its vehicle type's (LEFT JOIN), for building response dicts without ORM objects.
+    """
+    stmt = (
+        select(*ORDER_LISTING_COLUMNS, *PREDICTION_LISTING_COLUMNS, *VEHICLE_LISTING_COLUMNS)
+        .select_from(CustomerOrder)
+        .outerjoin(VehicleType, VehicleType.id == CustomerOrder.vehicle_type_id)
+        .where(*criteria)
+    )
+    return _paged(stmt, skip, limit, after)
+
+
+def order_listing_dicts(order_rows: Sequence[Sequence[Any]]) -> List[dict]:
+    """CustomerOrderResponse-shaped dicts from order_listing_select() rows, without Pydantic"""
+    order_fields = [c.key for c in ORDER_LISTING_COLUMNS]
+    prediction_fields = [f for f in OrderPredictionResponse.model_fields if f != "order_id"]
+    vehicle_fields = [c.key for c in VEHICLE_LISTING_COLUMNS]
+    prediction_start = len(order_fields)
+    vehicle_start = prediction_start + len(prediction_fields)
+
+    result = []
+    for row in order_rows:
+        order = dict(zip(order_fields, row[:prediction_start]))
+        prediction = row[prediction_start:vehicle_start]
+        vehicle = row[vehicle_start:]
+        order["vehicle_type"] = dict(zip(vehicle_fields, vehicle)) if vehicle[0] is not None else None
+        order["last_prediction"] = (
+            {**dict(zip(prediction_fields, prediction)), "order_id": order["id"]} if prediction[0] is not None else None
+        )
+        result.append(order)
+    return result
+
+
+def copy_csv_line(values: Sequence[Any]) -> str:
+    """
+    One COPY ... (FORMAT csv) line: every value quoted, NULL as an unquoted empty field
+    (COPY's CSV default), so no string value - not even "" or \\N - is read back as NULL.
+    """
+    return ",".join(
+        "" if value is None else '"' + str(value).replace('"', '""') + '"' for value in values
+    ) + "\n"
+
+
+def listing_version_stamp_select() -> Select:
+    """
+    Version stamp for order listing ETags as one row: count, max(updated_at) and max(id)
+    of orders and vehicle types (nested in the response) plus the newest prediction id.
+    """
+    aggregates = [
+        func.count(CustomerOrder.id), func.max(CustomerOrder.updated_at), func.max(CustomerOrder.id),
+        func.count(VehicleType.id), func.max(VehicleType.updated_at), func.max(VehicleType.id),
+        func.max(OrderPrediction.id),
+    ]
+    return select(*(select(aggregate).scalar_subquery() for aggregate in aggregates))
+
 
 class CustomerOrderRepository:
     """Repository for customer order database operations"""
@@ -13,10 +116,30 @@ class CustomerOrderRepository:
     def __init__(self, db: Session):
         self.db = db
     
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[CustomerOrder]:
-        """Get all customer orders with pagination"""
-        return self.db.query(CustomerOrder).offset(skip).limit(limit).all()
+    def _page(self, *criteria, skip: int, limit: int, after: Optional[OrderCursor]) -> List[CustomerOrder]:
+        """One listing page (see order_page_select)"""
+        return list(self.db.scalars(order_page_select(*criteria, skip=skip, limit=limit, after=after)))
+
+    def get_all(self, skip: int = 0, limit: int = 100, after: Optional[OrderCursor] = None) -> List[CustomerOrder]:
+        """Get all customer orders with offset or keyset pagination"""
+        return self._page(skip=skip, limit=limit, after=after)
     
+    def get_listing_dicts(
+        self,
+        *criteria,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[OrderCursor] = None
+    ) -> List[dict]:
+        """A listing page (orders matching criteria) as response dicts, in one Core query"""
+        return order_listing_dicts(
+            self.db.execute(order_listing_select(*criteria, skip=skip, limit=limit, after=after)).all()
+        )
+
+    def get_listing_version_stamp(self) -> tuple:
+        """Version stamp for order listing ETags, in one query (see listing_version_stamp_select)"""
+        return tuple(self.db.execute(listing_version_stamp_select()).one())
+
     def get_by_id(self, order_id: int) -> Optional[CustomerOrder]:
         """Get a customer order by ID"""
         return self.db.query(CustomerOrder).filter(CustomerOrder.id == order_id).first()
@@ -25,9 +148,15 @@ class CustomerOrderRepository:
         """Get a customer order by order number"""
         return self.db.query(CustomerOrder).filter(CustomerOrder.order_number == order_number).first()
     
-    def get_by_status(self, status: str, skip: int = 0, limit: int = 100) -> List[CustomerOrder]:
+    def get_by_status(
+        self,
+        status: str,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[OrderCursor] = None
+    ) -> List[CustomerOrder]:
         """Get customer orders by status"""
-        return self.db.query(CustomerOrder).filter(CustomerOrder.status == status).offset(skip).limit(limit).all()
+        return self._page(CustomerOrder.status == status, skip=skip, limit=limit, after=after)
     
     def create(self, order_data: CustomerOrderCreate) -> CustomerOrder:
         """Create a new customer order"""
@@ -61,11 +190,15 @@ class CustomerOrderRepository:
             return True
         return False
     
-    def get_by_vehicle_type(self, vehicle_type_id: int, skip: int = 0, limit: int = 100) -> List[CustomerOrder]:
+    def get_by_vehicle_type(
+        self,
+        vehicle_type_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[OrderCursor] = None
+    ) -> List[CustomerOrder]:
         """Get customer orders by vehicle type"""
-        return self.db.query(CustomerOrder).filter(
-            CustomerOrder.vehicle_type_id == vehicle_type_id
-        ).offset(skip).limit(limit).all()
+        return self._page(CustomerOrder.vehicle_type_id == vehicle_type_id, skip=skip, limit=limit, after=after)
     
     def confirm_order_with_vehicle(self, order_id: int, vehicle_type_id: int) -> Optional[CustomerOrder]:
         """Confirm an order by assigning a vehicle type and updating status"""
@@ -78,3 +211,287 @@ class CustomerOrderRepository:
             logger.info(f"Confirmed order ID {order_id} with vehicle type {vehicle_type_id}")
             return db_order
         return None
+
+    def get_by_ids(self, order_ids: Iterable[int]) -> List[CustomerOrder]:
+        """Orders by id (vehicle types eager-loaded), in the given order; missing ids are left out"""
+        order_ids = list(order_ids)
+        found = {}
+        for start in range(0, len(order_ids), LOOKUP_CHUNK_SIZE):
+            chunk = order_ids[start:start + LOOKUP_CHUNK_SIZE]
+            stmt = (
+                select(CustomerOrder)
+                .where(CustomerOrder.id.in_(chunk))
+                .options(selectinload(CustomerOrder.vehicle_type))
+            )
+            found.update((o.id, o) for o in self.db.scalars(stmt))
+        return [found[i] for i in order_ids if i in found]
+
+    def confirm_many(self, assignments: Dict[int, int]) -> List[int]:
+        """
+        Confirm orders with the assigned vehicle type ({order_id: vehicle_type_id}) in one transaction.
+        PostgreSQL runs one UPDATE ... FROM (VALUES ...) per CONFIRM_CHUNK_SIZE orders; other
+        databases a bulk UPDATE by primary key. Returns the ids of the orders that exist.
+        """
+        if not assignments:
+            return []
+
+        now = datetime.utcnow()
+        items = list(assignments.items())
+        confirmed = []
+        try:
+            for start in range(0, len(items), CONFIRM_CHUNK_SIZE):
+                chunk = items[start:start + CONFIRM_CHUNK_SIZE]
+                if self.db.get_bind().dialect.name == "postgresql":
+                    confirmed.extend(self._confirm_from_values(chunk, now))
+                else:
+                    confirmed.extend(self._confirm_by_pk(chunk, now))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        logger.info(f"Confirmed {len(confirmed)} orders")
+        return confirmed
+
+    def _confirm_from_values(self, chunk: List[Tuple[int, int]], now: datetime) -> List[int]:
+        assigned = values(
+            column("order_id", Integer), column("vehicle_type_id", Integer), name="assigned"
+        ).data(chunk)
+        stmt = (
+            update(CustomerOrder)
+            .where(CustomerOrder.id == assigned.c.order_id)
+            .values(vehicle_type_id=assigned.c.vehicle_type_id, status="confirmed", updated_at=now)
+            .returning(CustomerOrder.id)
+        )
+        return list(self.db.scalars(stmt))
+
+    def _confirm_by_pk(self, chunk: List[Tuple[int, int]], now: datetime) -> List[int]:
+        existing = set(self.db.scalars(
+            select(CustomerOrder.id).where(CustomerOrder.id.in_([order_id for order_id, _ in chunk]))
+        ))
+        rows = [
+            {"id": order_id, "vehicle_type_id": vehicle_type_id, "status": "confirmed", "updated_at": now}
+            for order_id, vehicle_type_id in chunk if order_id in existing
+        ]
+        if rows:
+            self.db.execute(update(CustomerOrder), rows)
+        return [row["id"] for row in rows]
+
+    def upsert_many(self, orders: List[dict], update_existing: bool = True) -> Dict[str, str]:
+        """
+        Insert orders (dicts of CustomerOrderCreate fields, all with the same keys and distinct
+        order numbers) in one transaction. Orders whose order_number exists get only the given
+        fields and updated_at updated, or are left untouched when update_existing is False.
+        Returns "created", "updated" or "skipped" per order_number.
+        """
+        if not orders:
+            return {}
+
+        now = datetime.utcnow()
+        update_columns = [key for key in orders[0] if key != "order_number"] + ["updated_at"]
+        rows = [{"status": "pending", **order, "created_at": now, "updated_at": now} for order in orders]
+
+        dialect = self.db.get_bind().dialect.name
+        try:
+            if dialect == "postgresql":
+                statuses = self._copy_upsert(rows, update_columns, update_existing)
+            elif dialect == "sqlite":
+                statuses = self._on_conflict_upsert(rows, update_columns, update_existing)
+            else:
+                statuses = self._lookup_upsert(rows, update_columns, update_existing)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        logger.info(f"Upserted {len(rows)} customer orders")
+        return statuses
+
+    def _existing_ids(self, order_numbers: List[str]) -> Dict[str, int]:
+        existing = {}
+        for start in range(0, len(order_numbers), LOOKUP_CHUNK_SIZE):
+            chunk = order_numbers[start:start + LOOKUP_CHUNK_SIZE]
+            existing.update(self.db.execute(
+                select(CustomerOrder.order_number, CustomerOrder.id).where(CustomerOrder.order_number.in_(chunk))
+            ).all())
+        return existing
+
+    def _copy_upsert(self, rows: List[dict], update_columns: List[str], update_existing: bool) -> Dict[str, str]:
+        """
+        PostgreSQL: COPY the batch into a temporary staging table, then one
+        INSERT ... SELECT ... ON CONFLICT (order_number) ... RETURNING. xmax = 0 marks inserted rows.
+        """
+        columns = list(rows[0])
+        staging = Table(
+            "customer_orders_staging", MetaData(),
+            *[Column(c, CustomerOrder.__table__.c[c].type) for c in columns],
+            prefixes=["TEMPORARY"], postgresql_on_commit="DROP"
+        )
+        connection = self.db.connection()
+        staging.create(connection)
+
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write(copy_csv_line([row[c] for c in columns]))
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {staging.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+
+        stmt = postgresql.insert(CustomerOrder).from_select(columns, select(*staging.c))
+        if update_existing:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[CustomerOrder.order_number],
+                set_={c: stmt.excluded[c] for c in update_columns}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[CustomerOrder.order_number])
+        returned = connection.execute(
+            stmt.returning(CustomerOrder.order_number, literal_column("xmax = 0").label("inserted"))
+        ).all()
+
+        statuses = {row["order_number"]: "skipped" for row in rows}
+        statuses.update({number: "created" if inserted else "updated" for number, inserted in returned})
+        return statuses
+
+    def _on_conflict_upsert(self, rows: List[dict], update_columns: List[str], update_existing: bool) -> Dict[str, str]:
+        """SQLite: one executemany INSERT ... ON CONFLICT (order_number) DO UPDATE / DO NOTHING"""
+        existing = self._existing_ids([row["order_number"] for row in rows])
+        stmt = sqlite.insert(CustomerOrder)
+        if update_existing:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[CustomerOrder.order_number],
+                set_={c: stmt.excluded[c] for c in update_columns}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[CustomerOrder.order_number])
+        self.db.execute(stmt, rows)
+        matched = "updated" if update_existing else "skipped"
+        return {row["order_number"]: matched if row["order_number"] in existing else "created" for row in rows}
+
+    def _lookup_upsert(self, rows: List[dict], update_columns: List[str], update_existing: bool) -> Dict[str, str]:
+        """Other databases: look up existing order numbers, bulk INSERT the new, bulk UPDATE by id the rest"""
+        existing = self._existing_ids([row["order_number"] for row in rows])
+        new_rows = [row for row in rows if row["order_number"] not in existing]
+        if new_rows:
+            self.db.execute(insert(CustomerOrder), new_rows)
+        if update_existing and len(new_rows) < len(rows):
+            self.db.execute(update(CustomerOrder), [
+                {"id": existing[row["order_number"]], **{c: row[c] for c in update_columns}}
+                for row in rows if row["order_number"] in existing
+            ])
+        matched = "updated" if update_existing else "skipped"
+        return {row["order_number"]: matched if row["order_number"] in existing else "created" for row in rows}
+
+    def _open_for_prediction_select(self, columns, model_version: Optional[str] = None) -> Select:
+        """
+        Open orders for a prediction run, as a Core select of the given columns.
+        With model_version, only orders whose latest prediction is missing, older than
+        the order's updated_at, or made by a different model version (incremental run),
+        read from the order's latest_* columns.
+        """
+        stmt = select(*columns).where(CustomerOrder.status.in_(OPEN_STATUSES))
+        if model_version is not None:
+            stmt = stmt.where(or_(
+                CustomerOrder.latest_prediction_id.is_(None),
+                CustomerOrder.latest_prediction_created_at < CustomerOrder.updated_at,
+                CustomerOrder.latest_model_version.is_(None),
+                CustomerOrder.latest_model_version != model_version
+            ))
+        return stmt
+
+    def count_open_for_prediction(self, model_version: Optional[str] = None) -> int:
+        """Count the orders a prediction run will score"""
+        open_orders = self._open_for_prediction_select([CustomerOrder.id], model_version).subquery()
+        return self.db.execute(select(func.count()).select_from(open_orders)).scalar_one()
+
+    def iter_open_for_prediction(
+        self,
+        columns,
+        model_version: Optional[str] = None,
+        chunk_size: int = 5000
+    ) -> Iterator[List[Row]]:
+        """
+        Stream the given columns of open orders for a prediction run in chunks, paging by id
+        (WHERE id > last_id ORDER BY id LIMIT chunk_size) so each page costs the same.
+        Rows are plain tuples, not ORM objects; the first column must be CustomerOrder.id.
+        """
+        last_id = 0
+        while True:
+            chunk = self.db.execute(
+                self._open_for_prediction_select(columns, model_version)
+                .where(CustomerOrder.id > last_id)
+                .order_by(CustomerOrder.id)
+                .limit(chunk_size)
+            ).all()
+            if not chunk:
+                return
+            last_id = chunk[-1][0]
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+
+
+class AsyncCustomerOrderRepository:
+    """
+    Async variant of the CustomerOrderRepository reads, for async endpoints.
+    vehicle_type is eager-loaded (selectinload) since lazy loads cannot run under an AsyncSession.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _page(self, *criteria, skip: int, limit: int, after: Optional[OrderCursor]) -> List[CustomerOrder]:
+        stmt = order_page_select(*criteria, skip=skip, limit=limit, after=after)
+        return list(await self.db.scalars(stmt.options(selectinload(CustomerOrder.vehicle_type))))
+
+    async def _one(self, *criteria) -> Optional[CustomerOrder]:
+        stmt = select(CustomerOrder).where(*criteria).options(selectinload(CustomerOrder.vehicle_type)).limit(1)
+        return (await self.db.scalars(stmt)).first()
+
+    async def get_all(self, skip: int = 0, limit: int = 100, after: Optional[OrderCursor] = None) -> List[CustomerOrder]:
+        """Get all customer orders with offset or keyset pagination"""
+        return await self._page(skip=skip, limit=limit, after=after)
+
+    async def get_listing_dicts(
+        self,
+        *criteria,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[OrderCursor] = None
+    ) -> List[dict]:
+        """A listing page (orders matching criteria) as response dicts, in one Core query"""
+        stmt = order_listing_select(*criteria, skip=skip, limit=limit, after=after)
+        return order_listing_dicts((await self.db.execute(stmt)).all())
+
+    async def get_listing_version_stamp(self) -> tuple:
+        """Version stamp for order listing ETags, in one query"""
+        return tuple((await self.db.execute(listing_version_stamp_select())).one())
+
+    async def get_by_id(self, order_id: int) -> Optional[CustomerOrder]:
+        """Get a customer order by ID"""
+        return await self._one(CustomerOrder.id == order_id)
+
+    async def get_by_order_number(self, order_number: str) -> Optional[CustomerOrder]:
+        """Get a customer order by order number"""
+        return await self._one(CustomerOrder.order_number == order_number)
+
+    async def get_by_status(
+        self,
+        status: str,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[OrderCursor] = None
+    ) -> List[CustomerOrder]:
+        """Get customer orders by status"""
+        return await self._page(CustomerOrder.status == status, skip=skip, limit=limit, after=after)
+
+    async def get_by_vehicle_type(
+        self,
+        vehicle_type_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[OrderCursor] = None
+    ) -> List[CustomerOrder]:
+        """Get customer orders by vehicle type"""
+        return await self._page(CustomerOrder.vehicle_type_id == vehicle_type_id, skip=skip, limit=limit, after=after)
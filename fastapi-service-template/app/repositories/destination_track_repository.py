@@ -0,0 +1,18 @@
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from models.destination_track import DestinationTrack
+
+
+class DestinationTrackRepository:
+    """Repository for destination track (route) database operations"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_all(self) -> List[DestinationTrack]:
+        """Get every destination track, oldest first"""
+        return self.db.query(DestinationTrack).order_by(DestinationTrack.id).all()
+
+    def get_by_id(self, track_id: int) -> Optional[DestinationTrack]:
+        """Get a destination track by ID"""
+        return self.db.query(DestinationTrack).filter(DestinationTrack.id == track_id).first()
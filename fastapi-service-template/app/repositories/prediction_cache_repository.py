@@ -0,0 +1,62 @@
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from typing import Dict, List, Sequence, Tuple
+import logging
+from models.prediction_cache_entry import PredictionCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Hashes per IN (...) lookup, below SQLite's bound parameter limit
+LOOKUP_CHUNK_SIZE = 900
+
+CachedOutput = Tuple[float, float, float, float]
+
+
+class PredictionCacheRepository:
+    """Repository for the database tier of the prediction cache"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_many(self, model_version: str, feature_hashes: Sequence[int]) -> Dict[int, CachedOutput]:
+        """Cached (lead_time, lower, upper, confidence) by feature hash, for the hashes present"""
+        found = {}
+        for start in range(0, len(feature_hashes), LOOKUP_CHUNK_SIZE):
+            chunk = feature_hashes[start:start + LOOKUP_CHUNK_SIZE]
+            rows = self.db.execute(
+                select(
+                    PredictionCacheEntry.feature_hash,
+                    PredictionCacheEntry.lead_time,
+                    PredictionCacheEntry.lead_time_lower,
+                    PredictionCacheEntry.lead_time_upper,
+                    PredictionCacheEntry.confidence,
+                )
+                .where(PredictionCacheEntry.model_version == model_version)
+                .where(PredictionCacheEntry.feature_hash.in_(chunk))
+            )
+            for feature_hash, *output in rows:
+                found[feature_hash] = tuple(output)
+        return found
+
+    def put_many(self, model_version: str, entries: List[dict]) -> None:
+        """
+        Store outputs (dicts with feature_hash, lead_time, lead_time_lower, lead_time_upper, confidence).
+        Entries another worker stored first are left as they are.
+        """
+        if not entries:
+            return
+        rows = [{**entry, "model_version": model_version} for entry in entries]
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql.insert(PredictionCacheEntry).on_conflict_do_nothing()
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(PredictionCacheEntry).on_conflict_do_nothing()
+        else:
+            stmt = insert(PredictionCacheEntry)
+        try:
+            self.db.execute(stmt, rows)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
@@ -0,0 +1,76 @@
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime, timedelta
+import logging
+import uuid
+from models.prediction_job import ACTIVE_JOB_STATUSES, PredictionJob
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionJobRepository:
+    """Repository for background prediction job database operations"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, full: bool = False) -> PredictionJob:
+        """
+        Create a queued prediction job.
+        Raises IntegrityError (after rolling back) if another job is already queued/running.
+        """
+        job = PredictionJob(id=uuid.uuid4().hex, status="queued", full=full, orders_scored=0)
+        self.db.add(job)
+        try:
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        self.db.refresh(job)
+        logger.info(f"Queued prediction job {job.id} (full={full})")
+        return job
+
+    def get_by_id(self, job_id: str) -> Optional[PredictionJob]:
+        """Get a prediction job by ID"""
+        return self.db.query(PredictionJob).filter(PredictionJob.id == job_id).first()
+
+    def get_recent(self, limit: int = 20) -> List[PredictionJob]:
+        """Get the most recently created prediction jobs"""
+        return self.db.query(PredictionJob).order_by(PredictionJob.created_at.desc()).limit(limit).all()
+
+    def get_active(self, stale_after_seconds: float) -> Optional[PredictionJob]:
+        """
+        Get the queued/running job, if any.
+        Jobs without a heartbeat for stale_after_seconds (e.g. their worker died) are marked failed.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_after_seconds)
+        for job in self.db.query(PredictionJob).filter(PredictionJob.status.in_(ACTIVE_JOB_STATUSES)).order_by(PredictionJob.created_at).all():
+            last_seen = job.heartbeat_at or job.created_at
+            if last_seen >= cutoff:
+                return job
+            job.status = "failed"
+            job.error = "Abandoned: no progress reported"
+            job.finished_at = datetime.utcnow()
+            self.db.commit()
+            logger.warning(f"Marked stale prediction job {job.id} as failed")
+        return None
+
+    def mark_running(self, job_id: str) -> None:
+        now = datetime.utcnow()
+        self.db.query(PredictionJob).filter(PredictionJob.id == job_id).update(
+            {"status": "running", "started_at": now, "heartbeat_at": now}
+        )
+        self.db.commit()
+
+    def update_progress(self, job_id: str, orders_scored: int, orders_total: Optional[int]) -> None:
+        self.db.query(PredictionJob).filter(PredictionJob.id == job_id).update(
+            {"orders_scored": orders_scored, "orders_total": orders_total, "heartbeat_at": datetime.utcnow()}
+        )
+        self.db.commit()
+
+    def mark_finished(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        now = datetime.utcnow()
+        self.db.query(PredictionJob).filter(PredictionJob.id == job_id).update(
+            {"status": status, "error": error, "finished_at": now, "heartbeat_at": now}
+        )
+        self.db.commit()
@@ -1,11 +1,138 @@
+from sqlalchemy import Select, Update, func, insert, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional, List
-from datetime import date, timedelta
+from typing import Optional, List, Dict, Any, Iterable, Sequence
+from datetime import date, datetime, timedelta
 import logging
+import numpy as np
+from models.customer_order import LATEST_PREDICTION_COLUMNS, CustomerOrder
 from models.order_prediction import OrderPrediction
 
 logger = logging.getLogger(__name__)
 
+# Number of predictions written per INSERT/commit by create_many
+BULK_WRITE_CHUNK_SIZE = 1000
+
+# Orders per latest-prediction UPDATE (IN list), below SQLite's bound parameter limit
+LATEST_UPDATE_CHUNK_SIZE = 900
+
+
+def compute_booking_dates(
+    requested_arrival_dates: Sequence[Optional[date]],
+    expected_lead_times: Sequence[Optional[float]]
+) -> List[Optional[date]]:
+    """
+    Vectorized recommended_booking_date for a whole batch.
+    Same rule as create(): requested_arrival - int(expected_lead_time) days,
+    None when the arrival date or lead time is missing/zero.
+    """
+    arrivals = np.array(requested_arrival_dates, dtype="datetime64[D]")
+    lead_times = np.array(
+        [np.nan if lt is None else lt for lt in expected_lead_times], dtype=float
+    )
+    valid = ~np.isnat(arrivals) & np.isfinite(lead_times) & (lead_times != 0)
+    offsets = np.trunc(np.where(valid, lead_times, 0)).astype("timedelta64[D]")
+    booking = np.where(valid, arrivals - offsets, np.datetime64("NaT"))
+    return booking.astype(object).tolist()
+
+
+def prediction_rows(predictions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """order_predictions rows for create_many() dicts, with booking dates computed for the whole batch"""
+    booking_dates = compute_booking_dates(
+        [p.get("requested_arrival_date") for p in predictions],
+        [p.get("expected_lead_time") for p in predictions]
+    )
+
+    rows = []
+    for p, booking_date in zip(predictions, booking_dates):
+        expected_lead_time = p.get("expected_lead_time")
+        predicted_co2 = p.get("predicted_co2")
+        rows.append({
+            "order_id": p["order_id"],
+            "expected_lead_time_days": float(expected_lead_time) if expected_lead_time is not None else None,
+            "predicted_co2_kg": float(predicted_co2) if predicted_co2 is not None else None,
+            "recommended_vehicle_type_id": p.get("recommended_vehicle_type_id"),
+            "destination_track_id": p.get("destination_track_id"),
+            "confidence": p.get("confidence"),
+            "recommended_booking_date": booking_date,
+            "model_version": p.get("model_version")
+        })
+    return rows
+
+
+def latest_for_orders_select(
+    order_ids: List[int],
+    dialect_name: str,
+    columns: Sequence = (OrderPrediction,),
+    since: Optional[datetime] = None
+) -> Select:
+    """
+    Latest prediction per order (as OrderPrediction objects, or the given columns):
+    DISTINCT ON (order_id) on PostgreSQL, a row_number() window elsewhere.
+    Both order by created_at desc, id desc. With since, only predictions created at or after it.
+    """
+    criteria = [OrderPrediction.order_id.in_(order_ids)]
+    if since is not None:
+        criteria.append(OrderPrediction.created_at >= since)
+
+    if dialect_name == "postgresql":
+        return (
+            select(*columns)
+            .where(*criteria)
+            .distinct(OrderPrediction.order_id)
+            .order_by(OrderPrediction.order_id, OrderPrediction.created_at.desc(), OrderPrediction.id.desc())
+        )
+
+    ranked = (
+        select(
+            OrderPrediction.id,
+            func.row_number().over(
+                partition_by=OrderPrediction.order_id,
+                order_by=(OrderPrediction.created_at.desc(), OrderPrediction.id.desc())
+            ).label("rank")
+        )
+        .where(*criteria)
+        .subquery()
+    )
+    return (
+        select(*columns)
+        .join(ranked, ranked.c.id == OrderPrediction.id)
+        .where(ranked.c.rank == 1)
+    )
+
+
+def latest_prediction_update(order_ids: List[int], dialect_name: str, since: datetime) -> Update:
+    """
+    UPDATE copying each order's newest prediction created since `since` into its latest_* columns.
+    Orders already holding a newer prediction (a concurrent writer) are left alone, and
+    updated_at is kept so incremental prediction runs do not see the order as changed.
+    """
+    mirrored = [getattr(OrderPrediction, field) for field in LATEST_PREDICTION_COLUMNS]
+    latest = latest_for_orders_select(order_ids, dialect_name, [OrderPrediction.order_id, *mirrored], since).subquery()
+    return (
+        update(CustomerOrder)
+        .where(CustomerOrder.id == latest.c.order_id)
+        .where(or_(
+            CustomerOrder.latest_prediction_id.is_(None),
+            tuple_(CustomerOrder.latest_prediction_created_at, CustomerOrder.latest_prediction_id)
+            < tuple_(latest.c.created_at, latest.c.id)
+        ))
+        .values({
+            **{column: latest.c[field] for field, column in LATEST_PREDICTION_COLUMNS.items()},
+            "updated_at": CustomerOrder.updated_at,
+        })
+        .execution_options(synchronize_session=False)
+    )
+
+
+def latest_prediction_updates(order_ids: Iterable[int], dialect_name: str, since: datetime) -> List[Update]:
+    """latest_prediction_update() statements for a batch of orders, LATEST_UPDATE_CHUNK_SIZE orders each"""
+    order_ids = sorted(set(order_ids))
+    return [
+        latest_prediction_update(order_ids[start:start + LATEST_UPDATE_CHUNK_SIZE], dialect_name, since)
+        for start in range(0, len(order_ids), LATEST_UPDATE_CHUNK_SIZE)
+    ]
+
 
 class OrderPredictionRepository:
     def __init__(self, db: Session):
@@ -19,7 +146,8 @@ class OrderPredictionRepository:
         recommended_vehicle_type_id: Optional[int] = None,
         destination_track_id: Optional[int] = None,
         confidence: Optional[float] = None,
-        requested_arrival_date: Optional[date] = None
+        requested_arrival_date: Optional[date] = None,
+        model_version: Optional[str] = None
     ) -> OrderPrediction:
         """
         Create a new prediction.
@@ -37,16 +165,120 @@ class OrderPredictionRepository:
             recommended_vehicle_type_id=recommended_vehicle_type_id,
             destination_track_id=destination_track_id,
             confidence=confidence,
-            recommended_booking_date=recommended_booking_date
+            recommended_booking_date=recommended_booking_date,
+            model_version=model_version
         )
         self.db.add(pred)
-        self.db.commit()
+        try:
+            self.db.flush()
+            self._update_latest([order_id], pred.created_at)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
         self.db.refresh(pred)
         logger.info(f"Saved prediction for order {order_id}: lead_time={expected_lead_time}d, booking_date={recommended_booking_date}")
         return pred
 
+    def create_many(
+        self,
+        predictions: List[Dict[str, Any]],
+        chunk_size: int = BULK_WRITE_CHUNK_SIZE
+    ) -> int:
+        """
+        Bulk insert predictions, one executemany INSERT and one commit per chunk.
+        Each dict takes the same keys as create(); recommended_booking_date is
+        computed for the whole batch at once. The orders' latest_* columns are
+        updated in the same transaction as their chunk. Returns the number of rows written.
+        """
+        if not predictions:
+            return 0
+
+        rows = prediction_rows(predictions)
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            try:
+                since = datetime.utcnow()
+                self.db.execute(insert(OrderPrediction), chunk)
+                self._update_latest([row["order_id"] for row in chunk], since)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+            logger.info(f"Saved {len(chunk)} predictions (batch {start // chunk_size + 1})")
+
+        return len(rows)
+
+    def _update_latest(self, order_ids: Iterable[int], since: datetime) -> None:
+        for stmt in latest_prediction_updates(order_ids, self.db.get_bind().dialect.name, since):
+            self.db.execute(stmt)
+
     def get_latest_for_order(self, order_id: int) -> Optional[OrderPrediction]:
         return self.db.query(OrderPrediction).filter(OrderPrediction.order_id == order_id).order_by(OrderPrediction.created_at.desc()).first()
 
+    def get_latest_for_orders(self, order_ids: Iterable[int]) -> Dict[int, OrderPrediction]:
+        """
+        Latest prediction per order for a whole page of orders in one query, keyed by order_id.
+        Orders without predictions are absent from the result.
+        """
+        order_ids = list(set(order_ids))
+        if not order_ids:
+            return {}
+
+        stmt = latest_for_orders_select(order_ids, self.db.get_bind().dialect.name)
+        return {p.order_id: p for p in self.db.scalars(stmt)}
+
     def get_all_for_order(self, order_id: int) -> List[OrderPrediction]:
         return self.db.query(OrderPrediction).filter(OrderPrediction.order_id == order_id).order_by(OrderPrediction.created_at.desc()).all()
+
+
+class AsyncOrderPredictionRepository:
+    """Async variant of OrderPredictionRepository for async endpoints"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_many(self, predictions: List[Dict[str, Any]]) -> int:
+        """
+        Insert predictions (same dicts as OrderPredictionRepository.create_many) and update
+        the orders' latest_* columns in one transaction
+        """
+        if not predictions:
+            return 0
+        rows = prediction_rows(predictions)
+        try:
+            since = datetime.utcnow()
+            await self.db.execute(insert(OrderPrediction), rows)
+            for stmt in latest_prediction_updates([row["order_id"] for row in rows], self.db.bind.dialect.name, since):
+                await self.db.execute(stmt)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        logger.info(f"Saved {len(rows)} predictions")
+        return len(rows)
+
+    async def get_latest_for_order(self, order_id: int) -> Optional[OrderPrediction]:
+        stmt = (
+            select(OrderPrediction)
+            .where(OrderPrediction.order_id == order_id)
+            .order_by(OrderPrediction.created_at.desc())
+            .limit(1)
+        )
+        return (await self.db.scalars(stmt)).first()
+
+    async def get_latest_for_orders(self, order_ids: Iterable[int]) -> Dict[int, OrderPrediction]:
+        """Latest prediction per order for a whole page of orders in one query, keyed by order_id"""
+        order_ids = list(set(order_ids))
+        if not order_ids:
+            return {}
+        stmt = latest_for_orders_select(order_ids, self.db.bind.dialect.name)
+        return {p.order_id: p for p in (await self.db.scalars(stmt))}
+
+    async def get_all_for_order(self, order_id: int) -> List[OrderPrediction]:
+        stmt = (
+            select(OrderPrediction)
+            .where(OrderPrediction.order_id == order_id)
+            .order_by(OrderPrediction.created_at.desc())
+        )
+        return list((await self.db.scalars(stmt)).all())
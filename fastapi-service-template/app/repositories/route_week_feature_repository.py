@@ -0,0 +1,34 @@
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from typing import List
+import logging
+from models.route_week_feature import RouteWeekFeature
+
+logger = logging.getLogger(__name__)
+
+
+class RouteWeekFeatureRepository:
+    """Repository for the route/week feature store"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def count(self) -> int:
+        return self.db.query(RouteWeekFeature).count()
+
+    def get_all_rows(self, columns) -> List[tuple]:
+        """Given columns of every feature store row, as plain tuples"""
+        return [tuple(row) for row in self.db.execute(select(*columns))]
+
+    def replace_all(self, rows: List[dict]) -> int:
+        """Replace the whole feature store with rows in one transaction. Returns the row count."""
+        try:
+            self.db.execute(delete(RouteWeekFeature))
+            if rows:
+                self.db.execute(insert(RouteWeekFeature), rows)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        logger.info(f"Stored {len(rows)} route feature rows")
+        return len(rows)
@@ -1,5 +1,7 @@
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set, Tuple
 from models.vehicle_type import VehicleType
 from schemas.vehicle_type import VehicleTypeCreate, VehicleTypeUpdate
 
@@ -10,17 +12,44 @@ class VehicleTypeRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_all(self, skip: int = 0, limit: int = 100, active_only: bool = False) -> List[VehicleType]:
-        """Get all vehicle types with pagination"""
+    def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        active_only: bool = False,
+        after: Optional[Tuple[str, int]] = None
+    ) -> List[VehicleType]:
+        """
+        Get all vehicle types ordered by (name, id) with offset pagination, or keyset
+        pagination after a (name, id) cursor (skip is then ignored)
+        """
         query = self.db.query(VehicleType)
         if active_only:
             query = query.filter(VehicleType.is_active == True)
-        return query.offset(skip).limit(limit).all()
+        if after is not None:
+            query = query.filter(tuple_(VehicleType.name, VehicleType.id) > tuple(after))
+            skip = 0
+        return query.order_by(VehicleType.name, VehicleType.id).offset(skip).limit(limit).all()
+
+    def get_version_stamp(self) -> tuple:
+        """
+        (count, max(updated_at), max(id)) of vehicle types for ETags, in one aggregate query.
+        Changes whenever a row is added, updated or deleted.
+        """
+        stamp = select(func.count(VehicleType.id), func.max(VehicleType.updated_at), func.max(VehicleType.id))
+        return tuple(self.db.execute(stamp).one())
 
     def get_by_id(self, vehicle_type_id: int) -> Optional[VehicleType]:
         """Get a vehicle type by ID"""
         return self.db.query(VehicleType).filter(VehicleType.id == vehicle_type_id).first()
 
+    def get_existing_ids(self, vehicle_type_ids: Iterable[int]) -> Set[int]:
+        """The given vehicle type ids that exist, in one query"""
+        ids = list(set(vehicle_type_ids))
+        if not ids:
+            return set()
+        return set(self.db.scalars(select(VehicleType.id).where(VehicleType.id.in_(ids))))
+
     def get_by_name(self, name: str) -> Optional[VehicleType]:
         """Get a vehicle type by name"""
         return self.db.query(VehicleType).filter(VehicleType.name == name).first()
@@ -72,3 +101,14 @@ class VehicleTypeRepository:
             query = query.filter(VehicleType.max_volume_m3 >= min_volume_m3)
         
         return query.order_by(VehicleType.max_weight_kg).all()
+
+
+class AsyncVehicleTypeRepository:
+    """Async variant of the VehicleTypeRepository lookups used by async endpoints"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, vehicle_type_id: int) -> Optional[VehicleType]:
+        """Get a vehicle type by ID"""
+        return await self.db.get(VehicleType, vehicle_type_id)
@@ -1,11 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime
+import json
 
-from models import get_db
-from schemas.customer_order import CustomerOrderCreate, CustomerOrderUpdate, CustomerOrderResponse
-from repositories.customer_order_repository import CustomerOrderRepository
-from repositories.prediction_repository import OrderPredictionRepository
+from models import CustomerOrder, get_async_db, get_db
+from schemas.customer_order import (
+    BulkOrderResponse, ConfirmBatchRequest, ConfirmBatchResponse,
+    CustomerOrderCreate, CustomerOrderUpdate, CustomerOrderResponse
+)
+from schemas.order_prediction import PredictionScoreResponse
+from repositories.customer_order_repository import AsyncCustomerOrderRepository, CustomerOrderRepository, OrderCursor
+from repositories.prediction_repository import AsyncOrderPredictionRepository, OrderPredictionRepository
+from repositories.vehicle_type_repository import AsyncVehicleTypeRepository, VehicleTypeRepository
+from services.online_prediction import score_order
+from services.order_import import OrderImport
+from utils.etag import make_etag, not_modified_response, set_etag
+from utils.fast_json import ORJSONResponse
+from utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 
 router = APIRouter(
     prefix="/orders",
@@ -13,61 +27,98 @@ router = APIRouter(
 )
 
 
+def parse_order_cursor(cursor: Optional[str]) -> Optional[OrderCursor]:
+    """Keyset position from the cursor query parameter (400 if it is not a valid order cursor)"""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor, (datetime, int))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def set_next_order_cursor(response: Response, orders, limit: int) -> None:
+    """Expose the next page's cursor in the X-Next-Cursor header when the page is full"""
+    if orders and len(orders) == limit:
+        last = orders[-1]
+        if isinstance(last, dict):
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last["created_at"], last["id"])
+        else:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+
+
+def fast_listing_response(response: Response, orders: List[dict], limit: int) -> ORJSONResponse:
+    """orjson response for a lean listing page, keeping the headers already set (ETag, cursor)"""
+    fast = ORJSONResponse(orders, headers={k: v for k, v in response.headers.items() if k != "content-length"})
+    set_next_order_cursor(fast, orders, limit)
+    return fast
+
+
 @router.get("/", response_model=List[CustomerOrderResponse])
 async def get_all_orders(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    fast: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get all customer orders with optional filtering by status
+    Get all customer orders with optional filtering by status, oldest first
     
-    - **skip**: Number of records to skip (for pagination)
+    - **skip**: Number of records to skip (for offset pagination)
     - **limit**: Maximum number of records to return
     - **status**: Filter by order status (pending, confirmed, in_transit, delivered, cancelled)
+    - **cursor**: Return the page after this cursor (from the X-Next-Cursor header of the previous page); skip is ignored
+    - **fast**: Build the page from plain rows and serialize it with orjson (same JSON, less CPU for large pages)
+
+    Responses carry an ETag; a request with a matching If-None-Match gets 304 Not Modified.
     """
-    repo = CustomerOrderRepository(db)
-    pred_repo = OrderPredictionRepository(db)
+    repo = AsyncCustomerOrderRepository(db)
+    after = parse_order_cursor(cursor)
+
+    # Unchanged tables -> 304 before loading or serializing the page
+    etag = make_etag("orders", await repo.get_listing_version_stamp(), str(request.query_params))
+    not_modified = not_modified_response(request, etag)
+    if not_modified:
+        return not_modified
+    set_etag(response, etag)
+
+    if fast:
+        criteria = [CustomerOrder.status == status] if status else []
+        orders = await repo.get_listing_dicts(*criteria, skip=skip, limit=limit, after=after)
+        return fast_listing_response(response, orders, limit)
     
     if status:
-        orders = repo.get_by_status(status, skip, limit)
+        orders = await repo.get_by_status(status, skip, limit, after)
     else:
-        orders = repo.get_all(skip, limit)
+        orders = await repo.get_all(skip, limit, after)
     
-    # Attach latest prediction to each order (monkey-patch attribute for Pydantic from_attributes)
-    for o in orders:
-        try:
-            latest = pred_repo.get_latest_for_order(o.id)
-            setattr(o, "last_prediction", latest)
-        except Exception:
-            setattr(o, "last_prediction", None)
+    # last_prediction comes from the orders' latest_* columns, no prediction lookup needed
+    set_next_order_cursor(response, orders, limit)
 
     return orders
 
 
 @router.get("/{order_id}", response_model=CustomerOrderResponse)
-async def get_order(order_id: int, db: Session = Depends(get_db)):
+async def get_order(order_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific customer order by ID"""
-    repo = CustomerOrderRepository(db)
-    order = repo.get_by_id(order_id)
+    repo = AsyncCustomerOrderRepository(db)
+    order = await repo.get_by_id(order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-    # attach latest prediction
-    pred_repo = OrderPredictionRepository(db)
-    setattr(order, "last_prediction", pred_repo.get_latest_for_order(order.id))
     return order
 
 
 @router.get("/by-order-number/{order_number}", response_model=CustomerOrderResponse)
-async def get_order_by_number(order_number: str, db: Session = Depends(get_db)):
+async def get_order_by_number(order_number: str, db: AsyncSession = Depends(get_async_db)):
     """Get a specific customer order by order number"""
-    repo = CustomerOrderRepository(db)
-    order = repo.get_by_order_number(order_number)
+    repo = AsyncCustomerOrderRepository(db)
+    order = await repo.get_by_order_number(order_number)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-    pred_repo = OrderPredictionRepository(db)
-    setattr(order, "last_prediction", pred_repo.get_latest_for_order(order.id))
     return order
 
 
@@ -75,15 +126,46 @@ async def get_order_by_number(order_number: str, db: Session = Depends(get_db)):
 
 
 @router.get("/{order_id}/recommendations")
-async def get_order_recommendations(order_id: int, db: Session = Depends(get_db)):
+async def get_order_recommendations(order_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get all predictions / recommendations for a specific order"""
-    pred_repo = OrderPredictionRepository(db)
-    preds = pred_repo.get_all_for_order(order_id)
+    pred_repo = AsyncOrderPredictionRepository(db)
+    preds = await pred_repo.get_all_for_order(order_id)
     return preds
 
 
+@router.post("/{order_id}/predict", response_model=PredictionScoreResponse)
+async def predict_order(order_id: int, save: bool = True, db: AsyncSession = Depends(get_async_db)):
+    """
+    Score a single order with the resident model (batched with concurrent requests).
+
+    - **save**: Store the result as the order's latest prediction
+    """
+    repo = AsyncCustomerOrderRepository(db)
+    order = await repo.get_by_id(order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+
+    try:
+        result = await score_order(order)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    if save:
+        await AsyncOrderPredictionRepository(db).create_many([{
+            "order_id": order.id,
+            "expected_lead_time": result.expected_lead_time_days,
+            "predicted_co2": result.predicted_co2_kg,
+            "recommended_vehicle_type_id": result.recommended_vehicle_type.id if result.recommended_vehicle_type else None,
+            "destination_track_id": result.destination_track_id,
+            "confidence": result.confidence,
+            "requested_arrival_date": order.requested_delivery_date,
+            "model_version": result.model_version,
+        }])
+    return result
+
+
 @router.post("/", response_model=CustomerOrderResponse, status_code=201)
-async def create_order(
+def create_order(
     order: CustomerOrderCreate,
     db: Session = Depends(get_db)
 ):
@@ -101,8 +183,77 @@ async def create_order(
     return repo.create(order)
 
 
+_BULK_ORDERS_BODY = {
+    "application/json": {"schema": {"type": "array", "items": CustomerOrderCreate.model_json_schema()}},
+    "application/x-ndjson": {"schema": {"type": "string", "description": "One CustomerOrderCreate JSON object per line"}},
+}
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkOrderResponse,
+    openapi_extra={"requestBody": {"required": True, "content": _BULK_ORDERS_BODY}}
+)
+async def bulk_upsert_orders(
+    request: Request,
+    on_conflict: str = Query("update", pattern="^(update|skip)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Create or update many orders at once, matched on order_number
+
+    The body is a JSON array of orders, or NDJSON (Content-Type: application/x-ndjson,
+    one order per line) which is upserted in batches while it streams in.
+
+    - **on_conflict**: `update` existing orders with the fields given in the row, or `skip` them
+
+    Returns created / updated / skipped / rejected counts and a result per input row.
+    """
+    importer = OrderImport(db, update_existing=on_conflict == "update")
+
+    # Parsing and validation are CPU-bound: they run in the threadpool with the writes,
+    # so a large import does not stall the event loop
+    def add_lines(lines: List[bytes]) -> None:
+        """Validate NDJSON lines and write the batches they fill"""
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                importer.add(json.loads(line))
+            except ValueError as e:
+                importer.reject_next([f"Invalid JSON: {e}"])
+        if importer.has_ready_batches:
+            importer.flush()
+
+    def add_array(body: bytes) -> None:
+        """Validate a JSON array of orders"""
+        try:
+            rows = json.loads(body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of orders")
+        for row in rows:
+            importer.add(row)
+
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        pending = b""
+        async for chunk in request.stream():
+            *lines, pending = (pending + chunk).split(b"\n")
+            if lines:
+                await run_in_threadpool(add_lines, lines)
+        await run_in_threadpool(add_lines, [pending])
+    else:
+        await run_in_threadpool(add_array, await request.body())
+
+    await run_in_threadpool(importer.flush, True)
+    return importer.summary()
+
+
 @router.put("/{order_id}", response_model=CustomerOrderResponse)
-async def update_order(
+def update_order(
     order_id: int,
     order: CustomerOrderUpdate,
     db: Session = Depends(get_db)
@@ -116,15 +267,60 @@ async def update_order(
 
 
 @router.delete("/{order_id}", status_code=204)
-async def delete_order(order_id: int, db: Session = Depends(get_db)):
+def delete_order(order_id: int, db: Session = Depends(get_db)):
     """Delete a customer order"""
     repo = CustomerOrderRepository(db)
     if not repo.delete(order_id):
         raise HTTPException(status_code=404, detail="Order not found")
 
 
+@router.post("/confirm-batch", response_model=ConfirmBatchResponse)
+def confirm_orders_batch(batch: ConfirmBatchRequest, db: Session = Depends(get_db)):
+    """
+    Confirm many orders at once, assigning a vehicle type to each.
+
+    - **orders**: (order_id, vehicle_type_id) assignments
+    - **accept_recommended**: order ids that take the vehicle recommended by their latest prediction
+
+    Vehicle types are validated in one query and the assignments applied in bulk.
+    Returns the confirmed orders with their latest prediction, and the orders that were rejected.
+    """
+    pred_repo = OrderPredictionRepository(db)
+    assignments = {c.order_id: c.vehicle_type_id for c in batch.orders}
+    rejected = {}
+
+    latest = pred_repo.get_latest_for_orders(batch.accept_recommended)
+    for order_id in batch.accept_recommended:
+        if order_id in assignments:
+            continue
+        prediction = latest.get(order_id)
+        if prediction is None or prediction.recommended_vehicle_type_id is None:
+            rejected[order_id] = "No recommended vehicle type"
+        else:
+            assignments[order_id] = prediction.recommended_vehicle_type_id
+
+    known_vehicle_types = VehicleTypeRepository(db).get_existing_ids(assignments.values())
+    for order_id, vehicle_type_id in list(assignments.items()):
+        if vehicle_type_id not in known_vehicle_types:
+            rejected[order_id] = f"Vehicle type {vehicle_type_id} not found"
+            del assignments[order_id]
+
+    repo = CustomerOrderRepository(db)
+    confirmed_ids = set(repo.confirm_many(assignments))
+    for order_id in assignments:
+        if order_id not in confirmed_ids:
+            rejected[order_id] = "Order not found"
+
+    orders = repo.get_by_ids(order_id for order_id in assignments if order_id in confirmed_ids)
+
+    return {
+        "confirmed": orders,
+        "rejected": [{"order_id": order_id, "error": error} for order_id, error in rejected.items()],
+    }
+
+
 @router.post("/{order_id}/confirm", response_model=CustomerOrderResponse)
-async def confirm_order(
+def confirm_order(
     order_id: int,
     vehicle_type_id: int,
     db: Session = Depends(get_db)
@@ -136,8 +332,6 @@ async def confirm_order(
     - **order_id**: The ID of the order to confirm
     - **vehicle_type_id**: The ID of the vehicle type to assign
     """
-    from repositories.vehicle_type_repository import VehicleTypeRepository
-    
     # Verify vehicle type exists
     vehicle_repo = VehicleTypeRepository(db)
     vehicle_type = vehicle_repo.get_by_id(vehicle_type_id)
@@ -150,45 +344,44 @@ async def confirm_order(
     if not confirmed_order:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    # Attach latest prediction
-    pred_repo = OrderPredictionRepository(db)
-    setattr(confirmed_order, "last_prediction", pred_repo.get_latest_for_order(confirmed_order.id))
-    
     return confirmed_order
 
 
 @router.get("/by-vehicle-type/{vehicle_type_id}", response_model=List[CustomerOrderResponse])
 async def get_orders_by_vehicle_type(
     vehicle_type_id: int,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    fast: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get all orders assigned to a specific vehicle type
+    Get all orders assigned to a specific vehicle type, oldest first
     
     - **vehicle_type_id**: The ID of the vehicle type
-    - **skip**: Number of records to skip (for pagination)
+    - **skip**: Number of records to skip (for offset pagination)
     - **limit**: Maximum number of records to return
+    - **cursor**: Return the page after this cursor (from the X-Next-Cursor header of the previous page); skip is ignored
+    - **fast**: Build the page from plain rows and serialize it with orjson (same JSON, less CPU for large pages)
     """
-    from repositories.vehicle_type_repository import VehicleTypeRepository
-    
+    after = parse_order_cursor(cursor)
+
     # Verify vehicle type exists
-    vehicle_repo = VehicleTypeRepository(db)
-    vehicle_type = vehicle_repo.get_by_id(vehicle_type_id)
+    vehicle_repo = AsyncVehicleTypeRepository(db)
+    vehicle_type = await vehicle_repo.get_by_id(vehicle_type_id)
     if not vehicle_type:
         raise HTTPException(status_code=404, detail="Vehicle type not found")
     
-    repo = CustomerOrderRepository(db)
-    orders = repo.get_by_vehicle_type(vehicle_type_id, skip, limit)
-    
-    # Attach latest prediction to each order
-    pred_repo = OrderPredictionRepository(db)
-    for o in orders:
-        try:
-            latest = pred_repo.get_latest_for_order(o.id)
-            setattr(o, "last_prediction", latest)
-        except Exception:
-            setattr(o, "last_prediction", None)
+    repo = AsyncCustomerOrderRepository(db)
+    if fast:
+        orders = await repo.get_listing_dicts(
+            CustomerOrder.vehicle_type_id == vehicle_type_id, skip=skip, limit=limit, after=after
+        )
+        return fast_listing_response(response, orders, limit)
+
+    orders = await repo.get_by_vehicle_type(vehicle_type_id, skip, limit, after)
+    set_next_order_cursor(response, orders, limit)
     
     return orders
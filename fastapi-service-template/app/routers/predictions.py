@@ -1,7 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from typing import List
 from models import get_db
-from predict.predict_open_orders import predict_open_orders
+from predict.model_registry import model_registry
+from predict.prediction_cache import prediction_cache
+from predict.route_features import refresh_route_feature_store
+from repositories.prediction_job_repository import PredictionJobRepository
+from schemas.order_prediction import PredictionScoreRequest, PredictionScoreResponse
+from schemas.prediction_job import PredictionJobResponse, PredictionRunResponse
+from services.online_prediction import score_order
+from services.prediction_jobs import submit_prediction_run
+from services.route_resolver import refresh_route_resolver
 
 router = APIRouter(
     prefix="/predictions",
@@ -9,14 +18,68 @@ router = APIRouter(
 )
 
 
-@router.post("/run")
-async def run_predictions(db: Session = Depends(get_db)):
-    """Trigger a prediction run for open orders. The backend container must have the trained model available at /models/catboost_model.json"""
+@router.post("/run", response_model=PredictionRunResponse, status_code=202)
+def run_predictions(full: bool = False, db: Session = Depends(get_db)):
+    """
+    Queue a prediction run for open orders and return its job immediately.
+    If a run is already queued or running, that job is returned instead (joined=true).
+    The backend container must have the trained model available at /models/catboost_model.json
+
+    - **full**: Re-score every open order instead of only orders changed since their latest prediction
+    """
+    job, joined = submit_prediction_run(db, full=full)
+    return PredictionRunResponse.model_validate(job).model_copy(update={"joined": joined})
+
+
+@router.post("/score", response_model=PredictionScoreResponse)
+async def score_prediction(request: PredictionScoreRequest):
+    """
+    Predict lead time, booking date, vehicle and CO2 for order features without storing anything.
+    Concurrent requests are scored together in small batches.
+    """
     try:
-        # run prediction synchronously
-        predict_open_orders()
-        return {"status": "ok", "message": "Prediction run completed"}
+        return await score_order(request)
     except FileNotFoundError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Prediction run failed: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get("/jobs", response_model=List[PredictionJobResponse])
+def get_prediction_jobs(limit: int = Query(20, ge=1, le=100), db: Session = Depends(get_db)):
+    """Get the most recent prediction runs"""
+    return PredictionJobRepository(db).get_recent(limit)
+
+
+@router.get("/jobs/{job_id}", response_model=PredictionJobResponse)
+def get_prediction_job(job_id: str, db: Session = Depends(get_db)):
+    """Get state, progress (orders scored/total), duration and error of a prediction run"""
+    job = PredictionJobRepository(db).get_by_id(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Prediction job not found")
+    return job
+
+
+@router.post("/routes/refresh")
+def refresh_routes(db: Session = Depends(get_db)):
+    """Reload the cached destination track (route) lookup and route feature store used by predictions"""
+    resolver = refresh_route_resolver(db)
+    route_features = refresh_route_feature_store(db)
+    return {"status": "ok", "routes": len(resolver), "route_feature_routes": len(route_features)}
+
+
+@router.get("/model")
+def get_model_info():
+    """Loaded model versions and load times for this worker, to confirm a deploy picked up a new model"""
+    return {"models": model_registry.info()}
+
+
+@router.get("/cache")
+def get_prediction_cache_stats():
+    """Prediction cache size and hit/miss counters for this worker"""
+    return prediction_cache.stats()
+
+
+@router.delete("/cache")
+def clear_prediction_cache():
+    """Clear this worker's in-process prediction cache and its counters"""
+    prediction_cache.clear()
+    return prediction_cache.stats()
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from models import get_db
 from services.vehicle_type_service import VehicleTypeService
 from schemas.vehicle_type import VehicleTypeCreate, VehicleTypeUpdate, VehicleTypeResponse
+from utils.etag import make_etag, not_modified_response, set_etag
+from utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 
 router = APIRouter(
     prefix="/vehicle-types",
@@ -13,20 +15,42 @@ router = APIRouter(
 
 @router.get("/", response_model=List[VehicleTypeResponse])
 def get_vehicle_types(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     active_only: bool = False,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Get all vehicle types.
+    Get all vehicle types, ordered by name.
     
-    - **skip**: Number of records to skip (pagination)
+    - **skip**: Number of records to skip (offset pagination)
     - **limit**: Maximum number of records to return
     - **active_only**: If true, only return active vehicle types
+    - **cursor**: Return the page after this cursor (from the X-Next-Cursor header of the previous page); skip is ignored
+
+    Responses carry an ETag; a request with a matching If-None-Match gets 304 Not Modified.
     """
     service = VehicleTypeService(db)
-    return service.get_all_vehicle_types(skip, limit, active_only)
+    etag = make_etag("vehicle-types", service.get_version_stamp(), str(request.query_params))
+    not_modified = not_modified_response(request, etag)
+    if not_modified:
+        return not_modified
+    set_etag(response, etag)
+
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor, (str, int))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    vehicle_types = service.get_all_vehicle_types(skip, limit, active_only, after)
+    if vehicle_types and len(vehicle_types) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(vehicle_types[-1].name, vehicle_types[-1].id)
+    return vehicle_types
 
 
 @router.get("/{vehicle_type_id}", response_model=VehicleTypeResponse)
@@ -1,9 +1,17 @@
 from .vehicle_type import VehicleTypeCreate, VehicleTypeResponse
-from .customer_order import CustomerOrderCreate, CustomerOrderUpdate, CustomerOrderResponse
-from .order_prediction import OrderPredictionResponse, OrderPredictionCreate
+from .customer_order import (
+    CustomerOrderCreate, CustomerOrderUpdate, CustomerOrderResponse, BulkOrderRowResult, BulkOrderResponse,
+    OrderConfirmation, ConfirmBatchRequest, ConfirmBatchRejection, ConfirmBatchResponse
+)
+from .order_prediction import (
+    OrderPredictionResponse, OrderPredictionCreate, PredictionScoreRequest, PredictionScoreResponse
+)
+from .prediction_job import PredictionJobResponse, PredictionRunResponse
 
 __all__ = [
     "VehicleTypeCreate", "VehicleTypeResponse",
-    "CustomerOrderCreate", "CustomerOrderUpdate", "CustomerOrderResponse",
-    "OrderPredictionResponse", "OrderPredictionCreate"
+    "CustomerOrderCreate", "CustomerOrderUpdate", "CustomerOrderResponse", "BulkOrderRowResult", "BulkOrderResponse",
+    "OrderConfirmation", "ConfirmBatchRequest", "ConfirmBatchRejection", "ConfirmBatchResponse",
+    "OrderPredictionResponse", "OrderPredictionCreate", "PredictionScoreRequest", "PredictionScoreResponse",
+    "PredictionJobResponse", "PredictionRunResponse"
 ]
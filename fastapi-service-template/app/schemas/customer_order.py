@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 from .vehicle_type import VehicleTypeResponse
 from .order_prediction import OrderPredictionResponse
@@ -75,3 +75,44 @@ class CustomerOrderResponse(BaseModel):
     last_prediction: Optional[OrderPredictionResponse] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class BulkOrderRowResult(BaseModel):
+    """Outcome of one row of a bulk order import"""
+    index: int
+    order_number: Optional[str] = None
+    status: str  # created, updated, skipped or rejected
+    errors: Optional[List[str]] = None
+
+
+class BulkOrderResponse(BaseModel):
+    """Summary of a bulk order import with per-row results in input order"""
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    rejected: int = 0
+    rows: List[BulkOrderRowResult] = []
+
+
+class OrderConfirmation(BaseModel):
+    """Vehicle assignment for one order of a batch confirmation"""
+    order_id: int
+    vehicle_type_id: int
+
+
+class ConfirmBatchRequest(BaseModel):
+    """Orders to confirm: explicit assignments and/or orders that take their recommended vehicle"""
+    orders: List[OrderConfirmation] = []
+    accept_recommended: List[int] = []
+
+
+class ConfirmBatchRejection(BaseModel):
+    """Order of a batch confirmation that was not confirmed"""
+    order_id: int
+    error: str
+
+
+class ConfirmBatchResponse(BaseModel):
+    """Confirmed orders (with their latest prediction) and the orders that were not confirmed"""
+    confirmed: List[CustomerOrderResponse] = []
+    rejected: List[ConfirmBatchRejection] = []
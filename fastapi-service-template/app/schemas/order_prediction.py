@@ -1,6 +1,7 @@
 from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime, date
+from .vehicle_type import VehicleTypeResponse
 
 
 class OrderPredictionResponse(BaseModel):
@@ -12,6 +13,7 @@ class OrderPredictionResponse(BaseModel):
     destination_track_id: Optional[int] = None
     confidence: Optional[float] = None
     recommended_booking_date: Optional[date] = None
+    model_version: Optional[str] = None
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
@@ -25,3 +27,28 @@ class OrderPredictionCreate(BaseModel):
     destination_track_id: Optional[int] = None
     confidence: Optional[float] = None
     recommended_booking_date: Optional[date] = None
+    model_version: Optional[str] = None
+
+
+class PredictionScoreRequest(BaseModel):
+    """Order features for stateless online scoring - same field names as CustomerOrderCreate"""
+    origin_country: Optional[str] = None
+    origin_state: Optional[str] = None
+    destination_country: Optional[str] = None
+    destination_state: Optional[str] = None
+    gross_weight_kg: Optional[float] = None
+    lead_time_days: Optional[int] = None
+    load_date: Optional[date] = None
+    requested_delivery_date: Optional[date] = None
+
+
+class PredictionScoreResponse(BaseModel):
+    """Online prediction result for a single order"""
+    order_id: Optional[int] = None
+    expected_lead_time_days: float
+    confidence: Optional[float] = None
+    recommended_booking_date: Optional[date] = None
+    recommended_vehicle_type: Optional[VehicleTypeResponse] = None
+    destination_track_id: Optional[int] = None
+    predicted_co2_kg: Optional[float] = None
+    model_version: str
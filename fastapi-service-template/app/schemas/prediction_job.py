@@ -0,0 +1,32 @@
+from pydantic import BaseModel, ConfigDict, computed_field
+from typing import Optional
+from datetime import datetime
+
+
+class PredictionJobResponse(BaseModel):
+    """Schema for a background prediction run"""
+    id: str
+    status: str
+    full: bool
+    orders_scored: int
+    orders_total: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        """Run time so far (running) or in total (finished)"""
+        if self.started_at is None:
+            return None
+        end = self.finished_at or datetime.utcnow()
+        return (end - self.started_at).total_seconds()
+
+
+class PredictionRunResponse(PredictionJobResponse):
+    """Schema for POST /predictions/run - joined is true when an active run was reused"""
+    joined: bool = False
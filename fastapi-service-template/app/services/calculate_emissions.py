@@ -1,7 +1,17 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from utils.emissions import calculate_co2_emissions_batch
+
+# Batch formula selection: "utils" = utils.emissions.calculate_co2_emissions,
+# "config" = calculate_co2_kg with an EmissionsConfig
+EMISSIONS_MODE_UTILS = "utils"
+EMISSIONS_MODE_CONFIG = "config"
+EMISSIONS_MODES = (EMISSIONS_MODE_UTILS, EMISSIONS_MODE_CONFIG)
 
 
 @dataclass(frozen=True)
@@ -78,6 +88,83 @@ def calculate_co2_kg(
     return float(co2)
 
 
+def emission_factors_for_vehicle_types(
+    vehicle_types: Iterable[str],
+    config: Optional[EmissionsConfig] = None,
+) -> np.ndarray:
+    """
+    Map vehicle type names to EmissionsConfig emission factors (kg CO2 per km).
+    Raises ValueError on the first unknown type, like calculate_co2_kg.
+    """
+    if config is None:
+        config = EmissionsConfig()
+
+    factors = []
+    for vehicle_type in vehicle_types:
+        vt = vehicle_type.strip().lower()
+        if vt not in config.emission_factors_kg_per_km:
+            valid = ", ".join(sorted(config.emission_factors_kg_per_km.keys()))
+            raise ValueError(f"Unknown vehicle_type='{vehicle_type}'. Valid: {valid}")
+        factors.append(config.emission_factors_kg_per_km[vt])
+    return np.array(factors, dtype=float)
+
+
+def calculate_co2_kg_batch(
+    distance_km,
+    weight_kg,
+    temperature_c,
+    emission_factor_kg_per_km,
+    config: Optional[EmissionsConfig] = None,
+) -> np.ndarray:
+    """
+    Vectorized calculate_co2_kg over NumPy arrays (or scalars, broadcast).
+    Takes emission factors directly; use emission_factors_for_vehicle_types()
+    to derive them from vehicle type names.
+
+    Returns:
+      Array of CO2 in kg. NaN inputs yield NaN.
+    """
+    if config is None:
+        config = EmissionsConfig()
+
+    distance_km = np.asarray(distance_km, dtype=float)
+    weight_kg = np.asarray(weight_kg, dtype=float)
+    temperature_c = np.asarray(temperature_c, dtype=float)
+    emission_factor_kg_per_km = np.asarray(emission_factor_kg_per_km, dtype=float)
+
+    if np.any(distance_km < 0):
+        raise ValueError("distance_km must be >= 0")
+    if np.any(weight_kg < 0):
+        raise ValueError("weight_kg must be >= 0")
+
+    base = distance_km * emission_factor_kg_per_km
+    weight_multiplier = 1.0 + (weight_kg / config.weight_scale_kg)
+    temp_delta = np.maximum(0.0, temperature_c - config.temp_baseline_c)
+    temp_multiplier = 1.0 + temp_delta * config.temp_increase_per_c
+
+    return base * weight_multiplier * temp_multiplier
+
+
+def calculate_co2_batch(
+    distance_km,
+    weight_kg,
+    temperature_c,
+    emission_factor_kg_per_km,
+    mode: str = EMISSIONS_MODE_UTILS,
+    config: Optional[EmissionsConfig] = None,
+) -> np.ndarray:
+    """
+    Batch CO2 (kg) for whole order sets, selecting the formula by mode:
+      - "utils": utils.emissions.calculate_co2_emissions
+      - "config": calculate_co2_kg with the given (or default) EmissionsConfig
+    """
+    if mode == EMISSIONS_MODE_UTILS:
+        return calculate_co2_emissions_batch(distance_km, weight_kg, temperature_c, emission_factor_kg_per_km)
+    if mode == EMISSIONS_MODE_CONFIG:
+        return calculate_co2_kg_batch(distance_km, weight_kg, temperature_c, emission_factor_kg_per_km, config)
+    raise ValueError(f"Unknown emissions mode='{mode}'. Valid: {', '.join(EMISSIONS_MODES)}")
+
+
 # Optional helper if you have distance in miles in your dataset
 def miles_to_km(miles: float) -> float:
     return miles * 1.609344
\ No newline at end of file
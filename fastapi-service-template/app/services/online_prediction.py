@@ -0,0 +1,75 @@
+"""
+Low-latency single-order predictions.
+
+Requests from POST /predictions/score and POST /orders/{id}/predict are
+coalesced by a MicroBatcher into small batches (ONLINE_BATCH_WINDOW_MS,
+ONLINE_MAX_BATCH_SIZE) and scored with the resident models, the process-wide
+capacity index, route resolver and route feature store through the same
+score_orders() used by batch runs.
+"""
+import logging
+import os
+from typing import Any, List
+
+from models import SessionLocal
+from predict.features import source_frame_from_objects
+from predict.route_features import get_route_feature_store
+from predict.predict_open_orders import lead_time_models, score_orders
+from repositories.prediction_repository import compute_booking_dates
+from schemas.order_prediction import PredictionScoreResponse
+from services.route_resolver import get_route_resolver
+from services.vehicle_capacity_index import get_capacity_index
+from utils.micro_batcher import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+ONLINE_BATCH_WINDOW_MS = float(os.getenv("ONLINE_BATCH_WINDOW_MS", "2"))
+ONLINE_MAX_BATCH_SIZE = int(os.getenv("ONLINE_MAX_BATCH_SIZE", "64"))
+
+
+def score_order_batch(orders: List[Any]) -> List[PredictionScoreResponse]:
+    """Score a micro-batch of orders (CustomerOrder rows or PredictionScoreRequest)"""
+    # One registry snapshot: the batch is scored and labelled with the same model versions
+    models = lead_time_models()
+
+    # Warm caches don't touch the database; the session only connects on a (re)load
+    db = SessionLocal()
+    try:
+        capacity_index = get_capacity_index(db)
+        route_resolver = get_route_resolver(db)
+        route_features = get_route_feature_store(db)
+    finally:
+        db.close()
+
+    predictions = score_orders(
+        source_frame_from_objects(orders), models, capacity_index, route_resolver, route_features
+    )
+    booking_dates = compute_booking_dates(
+        [p["requested_arrival_date"] for p in predictions],
+        [p["expected_lead_time"] for p in predictions]
+    )
+    return [
+        PredictionScoreResponse(
+            order_id=p["order_id"],
+            expected_lead_time_days=p["expected_lead_time"],
+            confidence=p["confidence"],
+            recommended_booking_date=booking_date,
+            recommended_vehicle_type=capacity_index.get(p["recommended_vehicle_type_id"]),
+            destination_track_id=p["destination_track_id"],
+            predicted_co2_kg=p["predicted_co2"],
+            model_version=p["model_version"],
+        )
+        for p, booking_date in zip(predictions, booking_dates)
+    ]
+
+
+prediction_batcher = MicroBatcher(
+    score_order_batch,
+    max_batch_size=ONLINE_MAX_BATCH_SIZE,
+    max_wait_ms=ONLINE_BATCH_WINDOW_MS
+)
+
+
+async def score_order(order: Any) -> PredictionScoreResponse:
+    """Score one order, batched with concurrent requests"""
+    return await prediction_batcher.submit(order)
@@ -0,0 +1,122 @@
+"""
+Bulk order import.
+
+Rows are validated against CustomerOrderCreate one by one and grouped by the
+set of fields they carry, so each batch is a single upsert that updates
+exactly the fields the rows provide (an ERP export without status keeps the
+status already set on confirmed orders). A group is written once it holds
+BULK_ORDER_BATCH_SIZE rows. When an order number repeats while an earlier row
+for it is still pending in any group, every pending group is queued first (in
+order of its first row), so rows for one order are applied in input order and
+the last one wins. If a batch fails, its rows are retried one by one so only
+the offending rows are rejected.
+"""
+import logging
+import os
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from repositories.customer_order_repository import CustomerOrderRepository
+from schemas.customer_order import BulkOrderResponse, BulkOrderRowResult, CustomerOrderCreate
+
+logger = logging.getLogger(__name__)
+
+BULK_ORDER_BATCH_SIZE = int(os.getenv("BULK_ORDER_BATCH_SIZE", "5000"))
+
+# (input index, order fields) rows of one upsert batch
+Batch = List[Tuple[int, Dict[str, Any]]]
+
+
+def _validation_errors(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" if e['loc'] else e['msg']
+        for e in error.errors()
+    ]
+
+
+class OrderImport:
+    """Validates bulk import rows and upserts them in batches"""
+
+    def __init__(self, db: Session, update_existing: bool = True, batch_size: int = BULK_ORDER_BATCH_SIZE):
+        self.repo = CustomerOrderRepository(db)
+        self.update_existing = update_existing
+        self.batch_size = batch_size
+        self.results: List[BulkOrderRowResult] = []
+        self._groups: Dict[FrozenSet[str], Batch] = {}
+        self._pending: Set[str] = set()  # order numbers queued in self._groups
+        self._ready: List[Batch] = []
+        self._count = 0
+
+    @property
+    def has_ready_batches(self) -> bool:
+        return bool(self._ready)
+
+    def add(self, raw: Any) -> None:
+        """Validate one input row and queue it for its group's batch"""
+        index = self._count
+        self._count += 1
+        try:
+            order = CustomerOrderCreate.model_validate(raw)
+        except ValidationError as e:
+            order_number = raw.get("order_number") if isinstance(raw, dict) else None
+            self.reject(index, _validation_errors(e), order_number)
+            return
+
+        fields = order.model_dump(exclude_unset=True)
+        if order.order_number in self._pending:
+            self._queue_groups()
+        key = frozenset(fields)
+        batch = self._groups.setdefault(key, [])
+        batch.append((index, fields))
+        self._pending.add(order.order_number)
+        if len(batch) >= self.batch_size:
+            self._ready.append(batch)
+            del self._groups[key]
+            self._pending.difference_update(fields["order_number"] for _, fields in batch)
+
+    def reject(self, index: int, errors: List[str], order_number: Optional[str] = None) -> None:
+        self.results.append(BulkOrderRowResult(index=index, order_number=order_number, status="rejected", errors=errors))
+
+    def reject_next(self, errors: List[str]) -> None:
+        """Reject an input row that could not be parsed"""
+        index = self._count
+        self._count += 1
+        self.reject(index, errors)
+
+    def flush(self, final: bool = False) -> None:
+        """Write the full batches (and, when final, every pending group)"""
+        if final:
+            self._queue_groups()
+        while self._ready:
+            self._write(self._ready.pop(0))
+
+    def summary(self) -> BulkOrderResponse:
+        rows = sorted(self.results, key=lambda r: r.index)
+        counts = {"created": 0, "updated": 0, "skipped": 0, "rejected": 0}
+        for row in rows:
+            counts[row.status] += 1
+        return BulkOrderResponse(**counts, rows=rows)
+
+    def _queue_groups(self) -> None:
+        """Move every pending group to the write queue, in order of its first row"""
+        self._ready.extend(sorted(self._groups.values(), key=lambda batch: batch[0][0]))
+        self._groups.clear()
+        self._pending.clear()
+
+    def _write(self, batch: Batch) -> None:
+        try:
+            statuses = self.repo.upsert_many([fields for _, fields in batch], self.update_existing)
+        except Exception as e:
+            if len(batch) == 1:
+                index, fields = batch[0]
+                self.reject(index, [str(getattr(e, "orig", e))], fields["order_number"])
+                return
+            logger.warning(f"Bulk order batch of {len(batch)} failed, retrying row by row: {e}")
+            for row in batch:
+                self._write([row])
+            return
+        for index, fields in batch:
+            number = fields["order_number"]
+            self.results.append(BulkOrderRowResult(index=index, order_number=number, status=statuses[number]))
@@ -0,0 +1,94 @@
+"""
+Background execution of prediction runs.
+
+POST /predictions/run queues a job and returns immediately; the run itself
+executes on a single-thread executor so the event loop is never blocked.
+Job state lives in the prediction_jobs table, so every worker can report it
+and a trigger while a run is queued/running joins that job instead of
+starting another. A unique partial index allows only one queued/running job,
+so when two workers queue a run at the same moment the second insert fails
+and that worker joins the first job. On Postgres an advisory lock additionally
+guarantees only one run executes at a time across all workers.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import SessionLocal, engine
+from models.prediction_job import PredictionJob
+from predict.predict_open_orders import predict_open_orders
+from repositories.prediction_job_repository import PredictionJobRepository
+
+logger = logging.getLogger(__name__)
+
+# Running jobs without a progress update for this long are treated as abandoned
+PREDICTION_JOB_STALE_SECONDS = float(os.getenv("PREDICTION_JOB_STALE_SECONDS", "900"))
+# pg_advisory_lock key reserved for prediction runs
+PREDICTION_RUN_LOCK_KEY = 720001
+# Check-then-insert rounds before giving up (a conflicting job may finish between the two)
+SUBMIT_ATTEMPTS = 3
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prediction-run")
+
+
+def submit_prediction_run(db: Session, full: bool = False) -> Tuple[PredictionJob, bool]:
+    """
+    Queue a prediction run, or join the one already queued/running.
+    Returns (job, joined).
+    """
+    repo = PredictionJobRepository(db)
+    for _ in range(SUBMIT_ATTEMPTS):
+        active = repo.get_active(PREDICTION_JOB_STALE_SECONDS)
+        if active is not None:
+            logger.info(f"Joining active prediction job {active.id}")
+            return active, True
+        try:
+            job = repo.create(full=full)
+        except IntegrityError:
+            # Another worker queued a job between the check and the insert: join it
+            continue
+        _executor.submit(_run_job, job.id, full)
+        return job, False
+    raise RuntimeError("Could not queue a prediction run: the active job changed repeatedly")
+
+
+@contextmanager
+def _exclusive_run():
+    """Hold a Postgres advisory lock for the duration of the run (no-op on other databases)"""
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as conn:
+        acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": PREDICTION_RUN_LOCK_KEY}).scalar()
+        if not acquired:
+            raise RuntimeError("Another prediction run is already executing")
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": PREDICTION_RUN_LOCK_KEY})
+
+
+def _run_job(job_id: str, full: bool) -> None:
+    db = SessionLocal()
+    repo = PredictionJobRepository(db)
+    try:
+        with _exclusive_run():
+            repo.mark_running(job_id)
+            predict_open_orders(
+                full=full,
+                progress=lambda scored, total: repo.update_progress(job_id, scored, total)
+            )
+        repo.mark_finished(job_id, "succeeded")
+        logger.info(f"Prediction job {job_id} succeeded")
+    except Exception as e:
+        logger.exception(f"Prediction job {job_id} failed")
+        db.rollback()
+        repo.mark_finished(job_id, "failed", str(e))
+    finally:
+        db.close()
@@ -0,0 +1,91 @@
+"""
+Preloaded route lookup for destination tracks.
+
+All DestinationTrack rows are loaded once into a dict keyed on the normalized
+(origin_city, destination_city) pair, so resolving an order's route is an O(1)
+lookup instead of a point query per order. The process-wide resolver is shared
+with the API and only reloads on refresh_route_resolver().
+"""
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from repositories.destination_track_repository import DestinationTrackRepository
+from schemas.destination_track import DestinationTrackResponse
+
+logger = logging.getLogger(__name__)
+
+RouteKey = Tuple[str, str]
+
+
+def normalize_location(value: Optional[str]) -> Optional[str]:
+    """Case- and whitespace-insensitive location code"""
+    if value is None:
+        return None
+    normalized = str(value).strip().upper()
+    return normalized or None
+
+
+def route_key(origin: Optional[str], destination: Optional[str]) -> Optional[RouteKey]:
+    origin = normalize_location(origin)
+    destination = normalize_location(destination)
+    if origin is None or destination is None:
+        return None
+    return origin, destination
+
+
+class RouteResolver:
+    """In-memory (origin, destination) -> destination track map"""
+
+    def __init__(self, tracks: Iterable[DestinationTrackResponse]):
+        self.routes: Dict[RouteKey, DestinationTrackResponse] = {}
+        for track in tracks:
+            key = route_key(track.origin_city, track.destination_city)
+            # Keep the first (lowest id) track per route, as the old .first() lookup did
+            if key is not None and key not in self.routes:
+                self.routes[key] = track
+
+    @classmethod
+    def from_db(cls, db: Session) -> "RouteResolver":
+        """Load every destination track in one query"""
+        tracks = DestinationTrackRepository(db).get_all()
+        resolver = cls(DestinationTrackResponse.model_validate(t) for t in tracks)
+        logger.info(f"Loaded {len(resolver)} routes into route resolver")
+        return resolver
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+    def resolve(self, origin: Optional[str], destination: Optional[str]) -> Optional[DestinationTrackResponse]:
+        key = route_key(origin, destination)
+        return self.routes.get(key) if key is not None else None
+
+    def resolve_many(
+        self,
+        origins: Iterable[Optional[str]],
+        destinations: Iterable[Optional[str]]
+    ) -> List[Optional[DestinationTrackResponse]]:
+        return [self.resolve(o, d) for o, d in zip(origins, destinations)]
+
+
+_resolver: Optional[RouteResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_route_resolver(db: Session) -> RouteResolver:
+    """Process-wide route resolver, loaded on first use"""
+    resolver = _resolver
+    if resolver is None:
+        resolver = refresh_route_resolver(db)
+    return resolver
+
+
+def refresh_route_resolver(db: Session) -> RouteResolver:
+    """Reload destination tracks and swap in a new process-wide resolver"""
+    global _resolver
+    resolver = RouteResolver.from_db(db)
+    with _resolver_lock:
+        _resolver = resolver
+    return resolver
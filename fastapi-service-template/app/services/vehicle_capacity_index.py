@@ -0,0 +1,145 @@
+"""
+In-memory capacity index for vehicle recommendation.
+
+Vehicle types are loaded once and kept sorted by (max_weight_kg, max_volume_m3),
+so "smallest vehicle that fits" is a bisect lookup for a single order and a
+searchsorted over the whole batch for a prediction run. The process-wide index
+is rebuilt lazily after invalidate_capacity_index() (called on vehicle type
+create/update/delete) or once it is older than VEHICLE_INDEX_TTL_SECONDS, which
+bounds staleness for the other uvicorn workers.
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from repositories.vehicle_type_repository import VehicleTypeRepository
+from schemas.vehicle_type import VehicleTypeResponse
+
+logger = logging.getLogger(__name__)
+
+VEHICLE_INDEX_TTL_SECONDS = float(os.getenv("VEHICLE_INDEX_TTL_SECONDS", "300"))
+
+
+def _capacity(value: Optional[float]) -> float:
+    """Unknown capacity is treated as unlimited (sorts last, fits everything)"""
+    return np.inf if value is None else float(value)
+
+
+class VehicleCapacityIndex:
+    """Active vehicle types sorted by capacity for smallest-fit lookups"""
+
+    def __init__(self, vehicles: Sequence[VehicleTypeResponse]):
+        self.vehicles: List[VehicleTypeResponse] = sorted(
+            vehicles, key=lambda v: (_capacity(v.max_weight_kg), _capacity(v.max_volume_m3))
+        )
+        self.weight_caps = np.array([_capacity(v.max_weight_kg) for v in self.vehicles], dtype=float)
+        self.volume_caps = np.array([_capacity(v.max_volume_m3) for v in self.vehicles], dtype=float)
+        self.ids = np.array([v.id for v in self.vehicles], dtype=np.int64)
+        self.emission_factors = np.array(
+            [np.nan if v.emission_factor_kg_per_km is None else v.emission_factor_kg_per_km for v in self.vehicles],
+            dtype=float
+        )
+        self._weight_keys = self.weight_caps.tolist()
+        self._by_id = {v.id: v for v in self.vehicles}
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def from_db(cls, db: Session) -> "VehicleCapacityIndex":
+        """Build the index from all active vehicle types in one query"""
+        vehicles = VehicleTypeRepository(db).get_by_capacity()
+        index = cls([VehicleTypeResponse.model_validate(v) for v in vehicles])
+        logger.info(f"Built vehicle capacity index with {len(index)} vehicle types")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.vehicles)
+
+    def get(self, vehicle_type_id: Optional[int]) -> Optional[VehicleTypeResponse]:
+        """Vehicle type by id, if it is in the index"""
+        return self._by_id.get(vehicle_type_id)
+
+    def is_expired(self, ttl_seconds: float = VEHICLE_INDEX_TTL_SECONDS) -> bool:
+        return time.monotonic() - self.built_at > ttl_seconds
+
+    def smallest_fit(
+        self,
+        weight_kg: Optional[float] = None,
+        volume_m3: Optional[float] = None
+    ) -> Optional[VehicleTypeResponse]:
+        """Smallest vehicle (by weight, then volume) that fits the load, or None"""
+        start = 0 if weight_kg is None else bisect.bisect_left(self._weight_keys, weight_kg)
+        for position in range(start, len(self.vehicles)):
+            if volume_m3 is None or self.volume_caps[position] >= volume_m3:
+                return self.vehicles[position]
+        return None
+
+    def smallest_fit_many(self, weights_kg, volumes_m3=None) -> np.ndarray:
+        """
+        Vectorized smallest_fit for a whole batch.
+        NaN weights/volumes mean "unknown" and fit any vehicle.
+        Returns positions into self.vehicles, -1 where nothing fits.
+        """
+        weights = np.asarray(weights_kg, dtype=float)
+        weights = np.where(np.isnan(weights), -np.inf, weights)
+        if volumes_m3 is None:
+            volumes = np.full(weights.shape, -np.inf)
+        else:
+            volumes = np.asarray(volumes_m3, dtype=float)
+            volumes = np.where(np.isnan(volumes), -np.inf, volumes)
+
+        if not self.vehicles:
+            return np.full(weights.shape, -1, dtype=np.int64)
+
+        # Every vehicle at or after the bisect position carries the weight
+        start = np.searchsorted(self.weight_caps, weights, side="left")
+        positions = np.arange(len(self.vehicles))
+        fits = (positions[None, :] >= start[:, None]) & (self.volume_caps[None, :] >= volumes[:, None])
+        return np.where(fits.any(axis=1), fits.argmax(axis=1), -1)
+
+    def candidates(
+        self,
+        weight_kg: Optional[float] = None,
+        volume_m3: Optional[float] = None
+    ) -> List[VehicleTypeResponse]:
+        """
+        All vehicles with a known capacity meeting the requirement, smallest first.
+        Mirrors VehicleTypeRepository.get_by_capacity().
+        """
+        start = 0 if weight_kg is None else bisect.bisect_left(self._weight_keys, weight_kg)
+        result = []
+        for vehicle in self.vehicles[start:]:
+            if weight_kg is not None and vehicle.max_weight_kg is None:
+                continue
+            if volume_m3 is not None and (vehicle.max_volume_m3 is None or vehicle.max_volume_m3 < volume_m3):
+                continue
+            result.append(vehicle)
+        return result
+
+
+_index: Optional[VehicleCapacityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_capacity_index(db: Session) -> VehicleCapacityIndex:
+    """Process-wide capacity index, rebuilt when invalidated or expired"""
+    global _index
+    index = _index
+    if index is None or index.is_expired():
+        with _index_lock:
+            if _index is None or _index.is_expired():
+                _index = VehicleCapacityIndex.from_db(db)
+            index = _index
+    return index
+
+
+def invalidate_capacity_index() -> None:
+    """Drop the process-wide index so the next lookup reloads the fleet"""
+    global _index
+    with _index_lock:
+        _index = None
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from repositories.vehicle_type_repository import VehicleTypeRepository
+from services.vehicle_capacity_index import get_capacity_index, invalidate_capacity_index
 from schemas.vehicle_type import VehicleTypeCreate, VehicleTypeUpdate, VehicleTypeResponse
 
 
@@ -8,18 +9,24 @@ class VehicleTypeService:
     """Service layer for vehicle type business logic"""
 
     def __init__(self, db: Session):
+        self.db = db
         self.repository = VehicleTypeRepository(db)
 
     def get_all_vehicle_types(
         self, 
         skip: int = 0, 
         limit: int = 100, 
-        active_only: bool = False
+        active_only: bool = False,
+        after: Optional[Tuple[str, int]] = None
     ) -> List[VehicleTypeResponse]:
         """Get all vehicle types"""
-        vehicle_types = self.repository.get_all(skip, limit, active_only)
+        vehicle_types = self.repository.get_all(skip, limit, active_only, after)
         return [VehicleTypeResponse.model_validate(vt) for vt in vehicle_types]
 
+    def get_version_stamp(self) -> tuple:
+        """Cheap version of the vehicle types table, for listing ETags"""
+        return self.repository.get_version_stamp()
+
     def get_vehicle_type_by_id(self, vehicle_type_id: int) -> Optional[VehicleTypeResponse]:
         """Get a vehicle type by ID"""
         vehicle_type = self.repository.get_by_id(vehicle_type_id)
@@ -42,6 +49,7 @@ class VehicleTypeService:
             raise ValueError(f"Vehicle type with name '{vehicle_type.name}' already exists")
         
         db_vehicle_type = self.repository.create(vehicle_type)
+        invalidate_capacity_index()
         return VehicleTypeResponse.model_validate(db_vehicle_type)
 
     def update_vehicle_type(
@@ -58,12 +66,16 @@ class VehicleTypeService:
         
         updated_vehicle_type = self.repository.update(vehicle_type_id, vehicle_type_update)
         if updated_vehicle_type:
+            invalidate_capacity_index()
             return VehicleTypeResponse.model_validate(updated_vehicle_type)
         return None
 
     def delete_vehicle_type(self, vehicle_type_id: int) -> bool:
         """Delete a vehicle type"""
-        return self.repository.delete(vehicle_type_id)
+        deleted = self.repository.delete(vehicle_type_id)
+        if deleted:
+            invalidate_capacity_index()
+        return deleted
 
     def recommend_vehicle_for_order(
         self, 
@@ -71,11 +83,7 @@ class VehicleTypeService:
         volume_m3: Optional[float] = None
     ) -> List[VehicleTypeResponse]:
         """Recommend suitable vehicle types for an order based on weight and volume"""
-        suitable_vehicles = self.repository.get_by_capacity(
-            min_weight_kg=weight_kg,
-            min_volume_m3=volume_m3
-        )
-        return [VehicleTypeResponse.model_validate(vt) for vt in suitable_vehicles]
+        return get_capacity_index(self.db).candidates(weight_kg, volume_m3)
 
     def initialize_default_vehicle_types(self) -> List[VehicleTypeResponse]:
         """Initialize default vehicle types from the dataset"""
@@ -147,4 +155,5 @@ class VehicleTypeService:
             else:
                 created_vehicles.append(VehicleTypeResponse.model_validate(existing))
         
+        invalidate_capacity_index()
         return created_vehicles
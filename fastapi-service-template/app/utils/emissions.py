@@ -3,6 +3,7 @@ CO2 Emissions Calculation Utilities
 
 Calculates CO2 emissions based on distance, weight, temperature, and vehicle emission factor.
 """
+import numpy as np
 
 
 def calculate_co2_emissions(
@@ -49,6 +50,30 @@ def calculate_co2_emissions(
     return co2_final
 
 
+def calculate_co2_emissions_batch(
+    distance_km,
+    weight_kg,
+    temp_c,
+    emission_factor_kg_per_km
+) -> np.ndarray:
+    """
+    Vectorized calculate_co2_emissions over NumPy arrays (or scalars, broadcast).
+    Same three steps as the scalar formula; NaN inputs yield NaN.
+    
+    Returns:
+        Array of total CO2 emissions in kg
+    """
+    distance_km = np.asarray(distance_km, dtype=float)
+    weight_kg = np.asarray(weight_kg, dtype=float)
+    temp_c = np.asarray(temp_c, dtype=float)
+    emission_factor_kg_per_km = np.asarray(emission_factor_kg_per_km, dtype=float)
+
+    co2_base = distance_km * emission_factor_kg_per_km
+    weight_factor = 1 + (0.1 * weight_kg / 100)
+    temp_factor = 1 + (0.01 * (temp_c - 25))
+    return co2_base * weight_factor * temp_factor
+
+
 def get_emission_factor_for_vehicle(vehicle_type) -> float:
     """
     Get the emission factor for a vehicle type.
@@ -0,0 +1,42 @@
+"""
+ETags for conditional GETs on list endpoints.
+
+The tag is a hash of a cheap version stamp of the underlying tables (row count,
+max(updated_at), max(id) - one aggregate query) plus the request's query
+string, so an unchanged page is answered with 304 before any rows are loaded
+or serialized.
+"""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Clients (and browsers) must revalidate, but may reuse the body on 304
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from version stamp parts"""
+    digest = hashlib.sha1("|".join(repr(p) for p in parts).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak comparison, as RFC 9110 requires for GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def not_modified_response(request: Request, etag: str) -> Optional[Response]:
+    """304 response if the request's If-None-Match matches etag, otherwise None"""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return None
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,19 @@
+"""
+orjson-backed JSON response for large list payloads.
+
+Endpoints that opt in build plain dicts/lists (e.g. straight from Core rows)
+and return them in an ORJSONResponse, skipping response model validation and
+jsonable_encoder. orjson writes dates and naive datetimes in the same ISO
+format as Pydantic, so the JSON matches the response model path.
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
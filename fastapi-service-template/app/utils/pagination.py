@@ -0,0 +1,57 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor encodes the (sort key, id) of the last row of a page. The next page is
+read with WHERE (sort_key, id) > (cursor) ORDER BY sort_key, id, which walks
+an index and costs the same at any depth, unlike OFFSET.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Tuple
+
+# Response header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise ValueError("unknown cursor value")
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """URL-safe token for a keyset position, e.g. encode_cursor(order.created_at, order.id)"""
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Tuple[type, ...]) -> Tuple[Any, ...]:
+    """
+    Keyset position from a token made by encode_cursor(), checked against the expected
+    value types, e.g. (datetime, int). Raises ValueError if it is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("wrong number of cursor values")
+        decoded = tuple(_decode_value(v) for v in values)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+    if not all(isinstance(v, t) and not isinstance(v, bool) for v, t in zip(decoded, types)):
+        raise ValueError("Invalid cursor: unexpected value types")
+    return decoded
@@ -0,0 +1,140 @@
+"""
+Connection pool configuration and saturation metrics.
+
+Pool size, overflow, timeout, recycle and pre-ping come from the DB_POOL_*
+environment variables and apply to both the sync and the async engine. The
+engines use instrumented QueuePool subclasses that time every checkout
+(waiting for a free connection or opening a new one) into a latency
+histogram and count checkouts that found the pool exhausted and timeouts.
+pool_stats() reports those together with the checked-out / idle / overflow
+counts. Pools are per process, so each uvicorn worker reports its own;
+size Postgres max_connections against
+workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) per engine in use.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last bucket is open-ended
+WAIT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class WaitHistogram:
+    """Thread-safe checkout latency histogram"""
+
+    def __init__(self, buckets_ms=WAIT_BUCKETS_MS):
+        self.buckets_ms = list(buckets_ms)
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.exhausted = 0
+        self.timeouts = 0
+
+    def observe(self, wait_ms: float, exhausted: bool = False) -> None:
+        position = next((i for i, bound in enumerate(self.buckets_ms) if wait_ms <= bound), len(self.buckets_ms))
+        with self._lock:
+            self._counts[position] += 1
+            self.count += 1
+            self.total_ms += wait_ms
+            self.max_ms = max(self.max_ms, wait_ms)
+            self.exhausted += int(exhausted)
+
+    def timed_out(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            labels = [f"le_{bound}ms" for bound in self.buckets_ms] + [f"gt_{self.buckets_ms[-1]}ms"]
+            return {
+                "count": self.count,
+                "mean_ms": self.total_ms / self.count if self.count else None,
+                "max_ms": self.max_ms,
+                "exhausted": self.exhausted,
+                "timeouts": self.timeouts,
+                "buckets": dict(zip(labels, self._counts)),
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Times _do_get (the checkout path that may block) into a WaitHistogram"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = WaitHistogram()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.wait_histogram = self.wait_histogram
+        return pool
+
+    def _do_get(self):
+        exhausted = self.checkedin() == 0 and 0 <= self._max_overflow <= self.overflow()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_histogram.timed_out()
+            raise
+        self.wait_histogram.observe((time.perf_counter() - start) * 1000, exhausted)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool with checkout wait metrics"""
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout wait metrics"""
+
+
+def pool_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    create_engine()/create_async_engine() pool arguments for url from the DB_POOL_* settings.
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def pool_stats(engine: Optional[Engine]) -> Optional[Dict[str, Any]]:
+    """Current pool state (and checkout wait histogram when instrumented) for an engine"""
+    if engine is None:
+        return None
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    histogram = getattr(pool, "wait_histogram", None)
+    if histogram is not None:
+        stats["checkout_wait"] = histogram.snapshot()
+    return stats
@@ -0,0 +1,112 @@
+"""
+Request logging middleware.
+
+A pure ASGI middleware: request and response messages are passed through
+untouched (responses keep streaming), and one metadata line per request is
+logged - method, path, status, response bytes and latency. With
+REQUEST_LOG_BODIES enabled, a REQUEST_LOG_BODY_SAMPLE_RATE fraction of
+requests also logs the first REQUEST_LOG_BODY_MAX_BYTES of both bodies.
+Records go through a QueueHandler, so formatting and I/O happen on the
+QueueListener thread instead of the event loop.
+"""
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LOG_BODIES = os.getenv("REQUEST_LOG_BODIES", "false").lower() in ("1", "true", "yes")
+REQUEST_LOG_BODY_SAMPLE_RATE = float(os.getenv("REQUEST_LOG_BODY_SAMPLE_RATE", "0.01"))
+REQUEST_LOG_BODY_MAX_BYTES = int(os.getenv("REQUEST_LOG_BODY_MAX_BYTES", "2048"))
+
+
+def start_request_log_listener(
+    handler: Optional[logging.Handler] = None
+) -> logging.handlers.QueueListener:
+    """
+    Route request log records through a queue to handler (stderr by default).
+    Returns the started listener; stop() it on shutdown to flush the queue.
+    """
+    if handler is None:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    for existing in list(logger.handlers):
+        if isinstance(existing, logging.handlers.QueueHandler):
+            logger.removeHandler(existing)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def _truncated(body: bytearray, total: int) -> str:
+    text = bytes(body).decode("utf-8", errors="replace")
+    return text if total <= len(body) else f"{text}... ({total} bytes)"
+
+
+class RequestLoggingMiddleware:
+    """Logs method, path, status, bytes and latency per request; optionally sampled, capped bodies"""
+
+    def __init__(
+        self,
+        app,
+        log_bodies: bool = REQUEST_LOG_BODIES,
+        body_sample_rate: float = REQUEST_LOG_BODY_SAMPLE_RATE,
+        max_body_bytes: int = REQUEST_LOG_BODY_MAX_BYTES
+    ):
+        self.app = app
+        self.log_bodies = log_bodies
+        self.body_sample_rate = body_sample_rate
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        capture = self.log_bodies and random.random() < self.body_sample_rate
+        limit = self.max_body_bytes
+        state = {"status": 500, "request_bytes": 0, "response_bytes": 0}
+        request_body = bytearray()
+        response_body = bytearray()
+
+        async def receive_logged():
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                state["request_bytes"] += len(body)
+                if capture and len(request_body) < limit:
+                    request_body.extend(body[:limit - len(request_body)])
+            return message
+
+        async def send_logged(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                state["response_bytes"] += len(body)
+                if capture and len(response_body) < limit:
+                    response_body.extend(body[:limit - len(response_body)])
+            await send(message)
+
+        try:
+            await self.app(scope, receive_logged if capture else receive, send_logged)
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            logger.info(
+                f"{scope['method']} {scope['path']} {state['status']} "
+                f"{state['response_bytes']}B {latency_ms:.1f}ms"
+            )
+            if capture:
+                logger.info(f"Request: {_truncated(request_body, state['request_bytes'])}")
+                logger.info(f"Response: {_truncated(response_body, state['response_bytes'])}")
@@ -1,9 +1,10 @@
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import { Link } from "react-router-dom";
 import { client } from "@/generated-api/client.gen";
 import {
   getAllOrdersOrdersGet,
+  getPredictionJobPredictionsJobsJobIdGet,
   runPredictionsPredictionsRunPost,
 } from "@/generated-api";
 import { Button } from "@/components/ui/button";
@@ -46,14 +47,44 @@ export function OrdersListView() {
       }),
   });
 
+  const [predictionJobId, setPredictionJobId] = useState<string | null>(null);
+
   const predictMutation = useMutation({
     mutationFn: () => runPredictionsPredictionsRunPost(),
-    onSuccess: () => {
-      // Refresh orders to show updated predictions
-      queryClient.invalidateQueries({ queryKey: ["orders"] });
+    onSuccess: (job) => {
+      // Runs execute in the background; poll the job until it finishes
+      setPredictionJobId(job.data.id);
     },
   });
 
+  const { data: predictionJob } = useQuery({
+    queryKey: ["prediction-job", predictionJobId],
+    queryFn: () =>
+      getPredictionJobPredictionsJobsJobIdGet({
+        path: { job_id: predictionJobId! },
+      }),
+    enabled: predictionJobId !== null,
+    refetchInterval: 1000,
+  });
+
+  const predictionJobStatus = predictionJob?.data.status;
+  const isPredicting =
+    predictMutation.isPending ||
+    (predictionJobId !== null &&
+      predictionJobStatus !== "succeeded" &&
+      predictionJobStatus !== "failed");
+
+  useEffect(() => {
+    if (
+      predictionJobStatus === "succeeded" ||
+      predictionJobStatus === "failed"
+    ) {
+      setPredictionJobId(null);
+      // Refresh orders to show updated predictions
+      queryClient.invalidateQueries({ queryKey: ["orders"] });
+    }
+  }, [predictionJobStatus, queryClient]);
+
   const handleRunPredictions = () => {
     predictMutation.mutate();
   };
@@ -79,9 +110,13 @@ export function OrdersListView() {
           <Button
             onClick={handleRunPredictions}
             variant="outline"
-            disabled={predictMutation.isPending}
+            disabled={isPredicting}
           >
-            {predictMutation.isPending ? "Running..." : "Run Predictions"}
+            {isPredicting
+              ? predictionJob?.data.orders_total
+                ? `Running... ${predictionJob.data.orders_scored}/${predictionJob.data.orders_total}`
+                : "Running..."
+              : "Run Predictions"}
           </Button>
           <Link to="/orders/new">
             <Button>Create New Order</Button>
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for the bulk order import (POST /orders/bulk).
+This script checks that:
+1. Rows for the same order number are applied in input order, even when
+   they carry different sets of fields (and so land in different batches)
+2. Per-row created/updated statuses follow input order
+"""
+
+import requests
+import time
+
+# API base URL
+BASE_URL = "http://localhost:8000"
+
+
+def test_mixed_field_sets():
+    """Repeated order number with different field sets: the last row wins"""
+    print("\n=== Testing Bulk Import Row Order ===")
+
+    suffix = int(time.time())
+    other = f"TEST-BULK-Z-{suffix}"
+    repeated = f"TEST-BULK-X-{suffix}"
+    rows = [
+        {"order_number": other, "requested_delivery_date": "2026-12-01", "status": "pending"},
+        {"order_number": repeated, "requested_delivery_date": "2026-12-01", "notes": "first"},
+        {"order_number": repeated, "requested_delivery_date": "2026-12-09", "status": "confirmed"},
+    ]
+
+    print("\n1. Importing rows with mixed field sets...")
+    response = requests.post(f"{BASE_URL}/orders/bulk", json=rows)
+    print(f"Status: {response.status_code}")
+    assert response.status_code == 200, response.text
+    statuses = [row["status"] for row in response.json()["rows"]]
+    print(f"Row statuses: {statuses}")
+    assert statuses == ["created", "created", "updated"], statuses
+
+    print(f"\n2. Getting order {repeated}...")
+    response = requests.get(f"{BASE_URL}/orders/by-order-number/{repeated}")
+    print(f"Status: {response.status_code}")
+    order = response.json()
+    print(f"  - Requested delivery: {order['requested_delivery_date']}")
+    print(f"  - Status: {order['status']}")
+    print(f"  - Notes: {order['notes']}")
+    assert order["requested_delivery_date"] == "2026-12-09", order["requested_delivery_date"]
+    assert order["status"] == "confirmed", order["status"]
+    assert order["notes"] == "first", order["notes"]
+
+
+def main():
+    """Main test function"""
+    print("=" * 60)
+    print("Bulk Order Import Test")
+    print("=" * 60)
+
+    try:
+        # Test health endpoint
+        print("\nChecking API health...")
+        response = requests.get(f"{BASE_URL}/health")
+        if response.status_code != 200:
+            print(f"API is not healthy. Status: {response.status_code}")
+            return
+        print("API is healthy!")
+
+        # Run tests
+        test_mixed_field_sets()
+
+        print("\n" + "=" * 60)
+        print("All tests completed!")
+        print("=" * 60)
+
+    except requests.exceptions.ConnectionError:
+        print(f"\nError: Could not connect to API at {BASE_URL}")
+        print("Make sure the backend service is running:")
+        print("  docker-compose up backend")
+    except Exception as e:
+        print(f"\nError during testing: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()